@@ -0,0 +1,207 @@
+import os
+import json
+import argparse
+from PIL import Image
+
+class AtlasError(RuntimeError):
+    """
+    An atlas specific runtime error
+    """
+
+class AtlasRegion(object):
+    """
+    A sub rectangle of one of the atlas sheets
+    """
+
+    __slots__ = ('sheet', 'x', 'y', 'width', 'height')
+
+    def __init__(self, sheet, x, y, width, height):
+        self.sheet = sheet
+        self.x = x
+        self.y = y
+        self.width = width
+        self.height = height
+
+    @property
+    def box(self):
+        return (self.x, self.y, self.x + self.width, self.y + self.height)
+
+class AtlasBuilder(object):
+    """
+    Packs many small images into a few square sheets, rows are filled left
+    to right with the tallest images first
+    """
+
+    SIZE = 512
+    PADDING = 1
+
+    def __init__(self, size=SIZE, padding=PADDING):
+        self.size = size
+        self.padding = padding
+        self.images = []
+
+    def add(self, name, image):
+        width, height = image.size
+
+        if width + self.padding * 2 > self.size or height + self.padding * 2 > self.size:
+            raise AtlasError('Failed to add image %s, larger than the sheet size %d!' % (name, self.size))
+
+        self.images.append((name, image.convert('RGBA')))
+
+    def add_strip(self, name, image, frame_width, frame_height):
+        """
+        Slices a sprite strip or grid into frames named `name#index`, the
+        frames are numbered left to right and top to bottom
+        """
+
+        width, height = image.size
+
+        if width % frame_width or height % frame_height:
+            raise AtlasError('Failed to slice %s into %dx%d frames!' % (name, frame_width, frame_height))
+
+        index = 0
+
+        for y in xrange(0, height, frame_height):
+            for x in xrange(0, width, frame_width):
+                self.add('%s#%d' % (name, index), image.crop((x, y, x + frame_width, y + frame_height)))
+                index += 1
+
+    def build(self):
+        sheets, regions = [], {}
+        x = y = row_height = 0
+
+        for name, image in sorted(self.images, key=lambda entry: (-entry[1].size[1], entry[0])):
+            width, height = image.size[0] + self.padding * 2, image.size[1] + self.padding * 2
+
+            # start the next row, or the next sheet once the rows run out.
+            if x + width > self.size:
+                x, y, row_height = 0, y + row_height, 0
+
+            if not sheets or y + height > self.size:
+                sheets.append(Image.new('RGBA', (self.size, self.size), (0, 0, 0, 0)))
+                x = y = row_height = 0
+
+            sheets[-1].paste(image, (x + self.padding, y + self.padding))
+            regions[name] = AtlasRegion(len(sheets) - 1, x + self.padding, y + self.padding, *image.size)
+
+            x += width
+            row_height = max(row_height, height)
+
+        return sheets, regions
+
+    def save(self, directory):
+        sheets, regions = self.build()
+
+        if not os.path.exists(directory):
+            os.makedirs(directory)
+
+        filenames = []
+
+        for index, sheet in enumerate(sheets):
+            filenames.append('sheet_%d.png' % index)
+            sheet.save(os.path.join(directory, filenames[-1]), optimize=True)
+
+        with open(os.path.join(directory, Atlas.INDEX), 'wb') as file:
+            json.dump({
+                'sheets': filenames,
+                'regions': {name: [region.sheet, region.x, region.y, region.width, region.height] for \
+                    name, region in regions.items()},
+            }, file, sort_keys=True)
+
+        return sheets, regions
+
+class Atlas(object):
+    """
+    Reads images out of the packed sheets, every sheet is opened and decoded
+    once no matter how many images are read from it
+    """
+
+    INDEX = 'index.json'
+
+    def __init__(self, directory):
+        self.directory = directory
+        self.filenames = []
+        self.sheets = {}
+        self.regions = {}
+
+        filepath = os.path.join(directory, self.INDEX)
+
+        # without an index every image is simply opened from its own file.
+        if not os.path.exists(filepath):
+            return
+
+        with open(filepath, 'rb') as file:
+            index = json.load(file)
+
+        self.filenames = [str(filename) for filename in index['sheets']]
+        self.regions = {str(name): AtlasRegion(*region) for name, region in index['regions'].items()}
+
+    def __len__(self):
+        return len(self.regions)
+
+    def has(self, name):
+        return name in self.regions
+
+    def sheet(self, index):
+        # the executor and the main thread may both get here first, the
+        # worst case is one sheet decoded twice.
+        sheet = self.sheets.get(index)
+
+        if not sheet:
+            sheet = Image.open(os.path.join(self.directory, self.filenames[index]))
+            sheet.load()
+
+            self.sheets[index] = sheet
+
+        return sheet
+
+    def image(self, name):
+        region = self.regions.get(name)
+
+        if not region:
+            raise AtlasError('Failed to find region %s in atlas %s!' % (name, self.directory))
+
+        return self.sheet(region.sheet).crop(region.box)
+
+    def destroy(self):
+        self.sheets = {}
+
+# sprite strips are sliced into frames, everything else is packed whole.
+STRIPS = {
+    'assets/explosion/exp2_0.png': (64, 64),
+}
+
+def build(source='assets', directory='assets/atlas', size=AtlasBuilder.SIZE):
+    builder = AtlasBuilder(size)
+
+    for path, directories, filenames in os.walk(source):
+        # never pack the atlas back into itself.
+        directories[:] = sorted(name for name in directories if os.path.join(path, name) != directory)
+
+        for filename in sorted(filenames):
+            if not filename.endswith('.png'):
+                continue
+
+            filepath = os.path.join(path, filename).replace(os.sep, '/')
+            image = Image.open(filepath)
+
+            if filepath in STRIPS:
+                builder.add_strip(filepath, image, *STRIPS[filepath])
+            elif max(image.size) <= size / 2:
+                builder.add(filepath, image)
+
+    return builder.save(directory)
+
+def main():
+    parser = argparse.ArgumentParser(description='Packs the image assets into atlas sheets.')
+    parser.add_argument('--source', default='assets')
+    parser.add_argument('--output', default='assets/atlas')
+    parser.add_argument('--size', type=int, default=AtlasBuilder.SIZE)
+
+    arguments = parser.parse_args()
+    sheets, regions = build(arguments.source, arguments.output, arguments.size)
+
+    print 'Packed %d images into %d sheets.' % (len(regions), len(sheets))
+
+if __name__ == '__main__':
+    main()
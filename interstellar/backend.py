@@ -0,0 +1,897 @@
+import os
+import re
+import time
+import heapq
+import pygame
+from PIL import Image
+from interstellar import util
+
+# the Tk option values every backend understands, plain strings so the
+# backends which do not draw with Tk never have to import it.
+NORMAL = 'normal'
+HIDDEN = 'hidden'
+CENTER = 'center'
+NW = 'nw'
+BOTH = 'both'
+
+class BackendError(RuntimeError):
+    """
+    A backend specific runtime error
+    """
+
+class Backend(object):
+    """
+    Creates the window, canvas, label, font and image objects the game
+    draws with, every backend must provide the same Tk like interface
+    """
+
+    NAME = None
+
+    @property
+    def errors(self):
+        """
+        The exceptions raised once the window has been closed underneath
+        the game, the main loop stops on them
+        """
+
+        return ()
+
+    def create_root(self):
+        pass
+
+    def create_canvas(self, master, **options):
+        pass
+
+    def create_label(self, master, **options):
+        pass
+
+    def create_font(self, **options):
+        pass
+
+    def create_photo_image(self, image):
+        pass
+
+    def load_font(self, filepath):
+        pass
+
+    def render(self, canvas):
+        """
+        Called once the frame's items have all been moved, backends which
+        draw the canvas themselves do it here
+        """
+
+        pass
+
+class TkBackend(Backend):
+    """
+    Draws everything with Tk widgets
+    """
+
+    NAME = 'tk'
+
+    # Tk is only imported by the backends which use it, the null and pygame
+    # renderers run on machines without it.
+    @property
+    def errors(self):
+        import _tkinter
+        return (_tkinter.TclError,)
+
+    def create_root(self):
+        import Tkinter
+        return Tkinter.Tk()
+
+    def create_canvas(self, master, **options):
+        from interstellar import tkcanvas
+        return tkcanvas.BatchedCanvas(master, **options)
+
+    def create_label(self, master, **options):
+        import Tkinter
+        return Tkinter.Label(master, **options)
+
+    def create_font(self, **options):
+        import tkFont
+        return tkFont.Font(**options)
+
+    def create_photo_image(self, image):
+        from PIL import ImageTk
+        return ImageTk.PhotoImage(image)
+
+    def load_font(self, filepath):
+        return util.load_font(filepath)
+
+    def render(self, canvas):
+        canvas.flush()
+
+class NullEvent(object):
+    """
+    The event passed to handlers of a null widget
+    """
+
+    __slots__ = ('widget', 'type', 'x', 'y')
+
+    def __init__(self, widget, type, x=0, y=0):
+        self.widget = widget
+        self.type = type
+        self.x = x
+        self.y = y
+
+class NullWidget(object):
+    """
+    A stand in for a Tk widget which keeps its options, bindings and
+    placement in plain data structures
+    """
+
+    def __init__(self, master=None, **options):
+        self.master = master
+        self.options = options
+        self.bindings = {}
+        self.x = 0
+        self.y = 0
+        self.visible = False
+
+    def __getitem__(self, key):
+        return self.options.get(key)
+
+    def __setitem__(self, key, value):
+        self.options[key] = value
+
+    def configure(self, **options):
+        self.options.update(options)
+
+    config = configure
+
+    def bind(self, sequence, function=None, add=None):
+        self.bindings[sequence] = function
+        return sequence
+
+    def unbind(self, sequence, funcid=None):
+        self.bindings.pop(sequence, None)
+
+    def event_generate(self, sequence, x=0, y=0, **kwargs):
+        function = self.bindings.get(sequence)
+
+        if callable(function):
+            function(NullEvent(self, sequence, x, y))
+
+    def focus_set(self):
+        pass
+
+    def pack(self, **options):
+        self.visible = True
+
+    def place(self, x=0, y=0, **options):
+        self.x, self.y = x, y
+        self.visible = True
+
+    def forget(self):
+        self.visible = False
+
+    pack_forget = place_forget = forget
+
+    def winfo_x(self):
+        return self.x
+
+    def winfo_y(self):
+        return self.y
+
+    def winfo_width(self):
+        return self.options.get('width', 0)
+
+    def winfo_height(self):
+        return self.options.get('height', 0)
+
+    def update(self):
+        pass
+
+    def update_idletasks(self):
+        pass
+
+    def destroy(self):
+        self.bindings = {}
+        self.visible = False
+
+class NullRoot(NullWidget):
+    """
+    A stand in for the Tk root window, after callbacks are kept on a heap
+    and run by `update` and `mainloop`
+    """
+
+    SCREEN_WIDTH = 1920
+    SCREEN_HEIGHT = 1080
+    GEOMETRY = re.compile(r'^(\d+)x(\d+)(?:\+(-?\d+)\+(-?\d+))?$')
+
+    def __init__(self):
+        super(NullRoot, self).__init__()
+
+        self.callbacks = []
+        self.pending = {}
+        self.protocols = {}
+        self.sequence = 0
+        self.running = False
+
+    def geometry(self, geometry):
+        match = self.GEOMETRY.match(geometry)
+
+        if not match:
+            raise BackendError('Failed to parse geometry %s!' % geometry)
+
+        width, height, x, y = match.groups()
+        self.options['width'], self.options['height'] = int(width), int(height)
+
+        if x is not None:
+            self.x, self.y = int(x), int(y)
+
+    def title(self, title):
+        self.options['title'] = title
+
+    def resizable(self, width, height):
+        self.options['resizable'] = (width, height)
+
+    def iconbitmap(self, filename):
+        self.options['icon'] = filename
+
+    def protocol(self, name, function):
+        self.protocols[name] = function
+
+    def winfo_screenwidth(self):
+        return self.SCREEN_WIDTH
+
+    def winfo_screenheight(self):
+        return self.SCREEN_HEIGHT
+
+    def after(self, milliseconds, function, *args):
+        self.sequence += 1
+
+        identifier = 'after#%d' % self.sequence
+        self.pending[identifier] = (function, args)
+        heapq.heappush(self.callbacks, (time.time() + milliseconds / 1000.0, self.sequence, identifier))
+
+        return identifier
+
+    def after_idle(self, function, *args):
+        return self.after(0, function, *args)
+
+    def after_cancel(self, identifier):
+        self.pending.pop(identifier, None)
+
+    def call(self, identifier):
+        function, args = self.pending.pop(identifier, (None, None))
+
+        if function:
+            function(*args)
+
+    def update(self):
+        # only run the callbacks which were due when the update started.
+        now = time.time()
+        due = []
+
+        while self.callbacks and self.callbacks[0][0] <= now:
+            due.append(heapq.heappop(self.callbacks)[2])
+
+        for identifier in due:
+            self.call(identifier)
+
+    def mainloop(self):
+        self.running = True
+
+        while self.running and self.callbacks:
+            timestamp, sequence, identifier = heapq.heappop(self.callbacks)
+            delay = timestamp - time.time()
+
+            if delay > 0:
+                time.sleep(delay)
+
+            self.call(identifier)
+
+        self.running = False
+
+    def quit(self):
+        self.running = False
+
+    def destroy(self):
+        self.callbacks = []
+        self.pending = {}
+        self.protocols = {}
+        self.running = False
+
+        super(NullRoot, self).destroy()
+
+class NullCanvasItem(object):
+    """
+    An item drawn on a null canvas
+    """
+
+    __slots__ = ('type', 'coords', 'options')
+
+    def __init__(self, type, coords, options):
+        self.type = type
+        self.coords = coords
+        self.options = options
+
+    @property
+    def tags(self):
+        tags = self.options.get('tags', ())
+
+        if isinstance(tags, basestring):
+            return tuple(tags.split())
+
+        return tuple(tags)
+
+class ItemCanvas(object):
+    """
+    Keeps the canvas items in plain data structures instead of Tk, shared by
+    every canvas which does not let Tk draw its items
+    """
+
+    def create_items(self):
+        self.items = {}
+        self.id = 0
+
+    def create_image(self, x, y, **options):
+        self.id += 1
+        self.items[self.id] = NullCanvasItem('image', [x, y], options)
+
+        return self.id
+
+    def coords(self, item, *coords):
+        entry = self.items.get(item)
+
+        if not entry:
+            return []
+
+        if not coords:
+            return list(entry.coords)
+
+        # coordinates may be passed flat or as a single sequence like Tk.
+        if len(coords) == 1:
+            coords = coords[0]
+
+        entry.coords = list(coords)
+
+    def itemconfigure(self, item, **options):
+        entry = self.items.get(item)
+
+        if entry:
+            entry.options.update(options)
+
+    itemconfig = itemconfigure
+
+    def itemcget(self, item, option):
+        return self.items[item].options.get(option)
+
+    def type(self, item):
+        entry = self.items.get(item)
+        return entry.type if entry else None
+
+    def find_all(self):
+        return tuple(sorted(self.items))
+
+    def find_withtag(self, tag):
+        if tag == 'all':
+            return self.find_all()
+
+        if tag in self.items:
+            return (tag,)
+
+        return tuple(sorted(item for item, entry in self.items.items() if tag in entry.tags))
+
+    def delete(self, *tags):
+        for tag in tags:
+            for item in self.find_withtag(tag):
+                del self.items[item]
+
+class NullCanvas(ItemCanvas, NullWidget):
+    """
+    A stand in for the Tk canvas which only tracks its items
+    """
+
+    def __init__(self, master=None, **options):
+        super(NullCanvas, self).__init__(master, **options)
+
+        self.create_items()
+
+    def destroy(self):
+        self.items = {}
+
+        super(NullCanvas, self).destroy()
+
+class NullLabel(NullWidget):
+    """
+    A stand in for a Tk label
+    """
+
+class NullFont(object):
+    """
+    A stand in for a Tk font
+    """
+
+    def __init__(self, **options):
+        self.options = options
+
+    def actual(self, option=None):
+        if option:
+            return self.options.get(option)
+
+        return dict(self.options)
+
+class NullPhotoImage(object):
+    """
+    A stand in for a Tk photo image, only the size of the image is read
+    so nothing is ever decoded
+    """
+
+    __slots__ = ('_width', '_height')
+
+    def __init__(self, image):
+        self._width, self._height = image.size
+
+    def width(self):
+        return self._width
+
+    def height(self):
+        return self._height
+
+class NullBackend(Backend):
+    """
+    Draws nothing, the game runs without Tk or a display server which is
+    used for benchmarks and soak tests
+    """
+
+    NAME = 'null'
+
+    def create_root(self):
+        return NullRoot()
+
+    def create_canvas(self, master, **options):
+        return NullCanvas(master, **options)
+
+    def create_label(self, master, **options):
+        return NullLabel(master, **options)
+
+    def create_font(self, **options):
+        return NullFont(**options)
+
+    def create_photo_image(self, image):
+        return NullPhotoImage(image)
+
+    def load_font(self, filepath):
+        return False
+
+class CompositorImage(object):
+    """
+    The decoded image itself, the compositor pastes it into the frame so
+    no Tk photo image is ever made for it
+    """
+
+    __slots__ = ('image', 'mask')
+
+    def __init__(self, image):
+        self.image = image.convert('RGBA') if 'A' in image.getbands() else image.convert('RGB')
+        self.mask = self.image if self.image.mode == 'RGBA' else None
+
+    def width(self):
+        return self.image.size[0]
+
+    def height(self):
+        return self.image.size[1]
+
+class Compositor(object):
+    """
+    Draws the items of a canvas into a single frame buffer, images are
+    alpha blended in the order they were created like Tk would stack them
+    """
+
+    def __init__(self, width, height, background='black'):
+        self.size = (width, height)
+        self.background = Image.new('RGB', self.size, background)
+        self.buffer = self.background.copy()
+
+    def composite(self, items):
+        self.buffer.paste(self.background, (0, 0))
+
+        for item in sorted(items):
+            entry = items[item]
+            image = entry.options.get('image')
+
+            if not image or entry.options.get('state') == HIDDEN:
+                continue
+
+            x, y = entry.coords[:2]
+
+            # every image in the game is anchored at its center, paste clips
+            # whatever falls outside of the frame.
+            if entry.options.get('anchor', CENTER) == CENTER:
+                x, y = x - image.width() / 2, y - image.height() / 2
+
+            self.buffer.paste(image.image, (int(x), int(y)), image.mask)
+
+        return self.buffer
+
+class CompositorBackend(TkBackend):
+    """
+    Keeps Tk for the window, labels and input but composites every image
+    into one frame buffer, Tk only ever redraws a single photo image
+    """
+
+    NAME = 'compositor'
+
+    def create_canvas(self, master, **options):
+        from interstellar import tkcanvas
+        return tkcanvas.CompositorCanvas(master, **options)
+
+    def create_photo_image(self, image):
+        return CompositorImage(image)
+
+    def render(self, canvas):
+        canvas.render()
+
+class PygameImage(object):
+    """
+    An image converted to a pygame surface in the display's pixel format
+    """
+
+    __slots__ = ('surface',)
+
+    def __init__(self, image):
+        mode = 'RGBA' if 'A' in image.getbands() else 'RGB'
+        surface = pygame.image.fromstring(image.convert(mode).tobytes(), image.size, mode)
+
+        # converting once up front keeps every blit a straight copy.
+        if pygame.display.get_surface():
+            surface = surface.convert_alpha() if mode == 'RGBA' else surface.convert()
+
+        self.surface = surface
+
+    def width(self):
+        return self.surface.get_width()
+
+    def height(self):
+        return self.surface.get_height()
+
+class PygameFont(object):
+    """
+    A pygame font made from one of the fonts registered with `load_font`
+    """
+
+    # Tk sizes fonts in points, pygame in pixels.
+    PIXELS_PER_POINT = 96 / 72.0
+
+    def __init__(self, filepaths, family=None, size=12, **options):
+        self.options = dict(options, family=family, size=size)
+        self.font = pygame.font.Font(filepaths.get(family), int(size * self.PIXELS_PER_POINT))
+
+    def actual(self, option=None):
+        if option:
+            return self.options.get(option)
+
+        return dict(self.options)
+
+class PygameLabel(NullWidget):
+    """
+    A label drawn by its canvas after the images, the text is only rendered
+    again when it or its colors change
+    """
+
+    def __init__(self, master=None, **options):
+        super(PygameLabel, self).__init__(master, **options)
+
+        self.surface = None
+        self.rect = None
+
+    def __setitem__(self, key, value):
+        self.configure(**{key: value})
+
+    def configure(self, **options):
+        super(PygameLabel, self).configure(**options)
+        self.surface = None
+
+    config = configure
+
+    def render(self):
+        if self.surface:
+            return self.surface
+
+        font = self.options.get('font')
+        text = self.options.get('text')
+        foreground = pygame.Color(self.options.get('foreground', 'white'))
+        background = pygame.Color(self.options.get('background', 'black'))
+
+        lines = [font.font.render(line, False, foreground, background) for line in \
+            ('%s' % text if text is not None else '').split('\n')]
+
+        width, height = max(line.get_width() for line in lines), sum(line.get_height() for line in lines)
+        self.surface = pygame.Surface((max(width, 1), max(height, 1)))
+        self.surface.fill(background)
+
+        # multi line labels are centered line by line like Tk does.
+        y = 0
+
+        for line in lines:
+            self.surface.blit(line, ((width - line.get_width()) / 2, y))
+            y += line.get_height()
+
+        return self.surface
+
+    def place(self, x=0, y=0, **options):
+        super(PygameLabel, self).place(x, y, **options)
+        self.master.add_label(self)
+
+    def forget(self):
+        super(PygameLabel, self).forget()
+        self.master.remove_label(self)
+
+    pack_forget = place_forget = forget
+
+    def winfo_width(self):
+        return self.render().get_width()
+
+    def winfo_height(self):
+        return self.render().get_height()
+
+    def destroy(self):
+        self.forget()
+        super(PygameLabel, self).destroy()
+
+class PygameCanvas(ItemCanvas, NullWidget):
+    """
+    Draws the canvas items and labels onto the pygame display, only the
+    rectangles which changed since the last frame are drawn and updated
+    """
+
+    # past this many changed rectangles redrawing the whole frame is cheaper.
+    MAXIMUM_DIRTY = 32
+
+    def __init__(self, master=None, **options):
+        super(PygameCanvas, self).__init__(master, **options)
+
+        self.create_items()
+        self.labels = []
+        self.drawn = {}
+        self.background = pygame.Color(options.get('background', 'black'))
+
+    def focus_set(self):
+        self.master.focus = self
+
+    def add_label(self, label):
+        if label not in self.labels:
+            self.labels.append(label)
+
+    def remove_label(self, label):
+        if label in self.labels:
+            self.labels.remove(label)
+
+    def label_at(self, position):
+        # the label placed last is on top.
+        for label in reversed(self.labels):
+            if label.rect and label.rect.collidepoint(position):
+                return label
+
+        return None
+
+    def layout(self):
+        """
+        Returns where every visible item and label is drawn this frame
+        """
+
+        layout = {}
+
+        for item, entry in self.items.iteritems():
+            image = entry.options.get('image')
+
+            if not image or entry.options.get('state') == HIDDEN:
+                continue
+
+            rect = image.surface.get_rect()
+            rect.center = (int(entry.coords[0]), int(entry.coords[1]))
+            layout[item] = (rect, image.surface)
+
+        for label in self.labels:
+            surface = label.render()
+            label.rect = surface.get_rect()
+            label.rect.center = (int(label.x), int(label.y))
+            layout[label] = (label.rect, surface)
+
+        return layout
+
+    def render(self):
+        screen = pygame.display.get_surface()
+
+        if not screen:
+            return
+
+        layout = self.layout()
+        dirty = []
+
+        # anything which moved, changed its image, appeared or went away.
+        for key in set(layout) | set(self.drawn):
+            drawn, current = self.drawn.get(key), layout.get(key)
+
+            if drawn == current:
+                continue
+
+            dirty.extend(entry[0] for entry in (drawn, current) if entry)
+
+        self.drawn = layout
+
+        if not dirty:
+            return
+
+        if len(dirty) > self.MAXIMUM_DIRTY:
+            dirty = [screen.get_rect()]
+
+        items = [layout[item] for item in sorted(item for item in layout if not isinstance(item, PygameLabel))]
+        items.extend(layout[label] for label in self.labels)
+
+        for rect in dirty:
+            screen.set_clip(rect)
+            screen.fill(self.background)
+
+            for item_rect, surface in items:
+                if item_rect.colliderect(rect):
+                    screen.blit(surface, item_rect)
+
+        screen.set_clip(None)
+        pygame.display.update(dirty)
+
+    def destroy(self):
+        self.items = {}
+        self.labels = []
+        self.drawn = {}
+
+        super(PygameCanvas, self).destroy()
+
+class PygameRoot(NullRoot):
+    """
+    The pygame display window, keyboard and mouse events are turned into the
+    Tk event sequences the scenes and labels bind
+    """
+
+    KEYSYMS = {
+        'up': 'Up',
+        'down': 'Down',
+        'left': 'Left',
+        'right': 'Right',
+        'return': 'Return',
+        'escape': 'Escape',
+    }
+
+    EVENTS = (pygame.QUIT, pygame.KEYDOWN, pygame.KEYUP, pygame.MOUSEMOTION, pygame.MOUSEBUTTONDOWN)
+
+    def __init__(self):
+        super(PygameRoot, self).__init__()
+
+        self.focus = None
+        self.hovering = None
+
+    def geometry(self, geometry):
+        super(PygameRoot, self).geometry(geometry)
+
+        size = (self.options['width'], self.options['height'])
+
+        # the window position can only be chosen before the window exists.
+        if not pygame.display.get_surface() or pygame.display.get_surface().get_size() != size:
+            if all(size):
+                pygame.display.set_mode(size, 0, 32)
+
+    def title(self, title):
+        super(PygameRoot, self).title(title)
+        pygame.display.set_caption(title)
+
+    def winfo_screenwidth(self):
+        return pygame.display.Info().current_w
+
+    def winfo_screenheight(self):
+        return pygame.display.Info().current_h
+
+    def keysym(self, key):
+        name = pygame.key.name(key)
+        return self.KEYSYMS.get(name, name.upper() if name.startswith('f') and name[1:].isdigit() else name)
+
+    def dispatch(self):
+        # joystick events are left in the queue for the game controller.
+        for event in pygame.event.get(self.EVENTS):
+            if event.type == pygame.QUIT:
+                function = self.protocols.get('WM_DELETE_WINDOW')
+
+                if callable(function):
+                    function()
+            elif event.type == pygame.KEYDOWN and self.focus:
+                self.focus.event_generate('<%s>' % self.keysym(event.key))
+            elif event.type == pygame.KEYUP and self.focus:
+                self.focus.event_generate('<KeyRelease-%s>' % self.keysym(event.key))
+            elif event.type == pygame.MOUSEMOTION:
+                self.hover(event.pos)
+            elif event.type == pygame.MOUSEBUTTONDOWN and event.button == 1:
+                self.hover(event.pos)
+
+                if self.hovering:
+                    self.hovering.event_generate('<Button-1>', *event.pos)
+
+    def hover(self, position):
+        label = self.focus.label_at(position) if self.focus else None
+
+        if label is self.hovering:
+            return
+
+        if self.hovering:
+            self.hovering.event_generate('<Leave>', *position)
+
+        self.hovering = label
+
+        if label:
+            label.event_generate('<Enter>', *position)
+
+    def update(self):
+        self.dispatch()
+        super(PygameRoot, self).update()
+
+    def mainloop(self):
+        self.running = True
+
+        while self.running and self.callbacks:
+            self.dispatch()
+
+            # wake up for input at least every few milliseconds.
+            delay = self.callbacks[0][0] - time.time()
+
+            if delay > 0:
+                time.sleep(min(delay, 0.005))
+                continue
+
+            self.call(heapq.heappop(self.callbacks)[2])
+
+        self.running = False
+
+    def destroy(self):
+        self.focus = None
+        self.hovering = None
+
+        super(PygameRoot, self).destroy()
+        pygame.display.quit()
+
+class PygameBackend(Backend):
+    """
+    Draws with pygame surfaces and dirty rectangle updates, moving an image
+    is a Python attribute change instead of a Tcl call
+    """
+
+    NAME = 'pygame'
+
+    def __init__(self):
+        self.fonts = {}
+
+    def create_root(self):
+        pygame.display.init()
+        pygame.font.init()
+
+        return PygameRoot()
+
+    def create_canvas(self, master, **options):
+        return PygameCanvas(master, **options)
+
+    def create_label(self, master, **options):
+        return PygameLabel(master, **options)
+
+    def create_font(self, **options):
+        return PygameFont(self.fonts, **options)
+
+    def create_photo_image(self, image):
+        return PygameImage(image)
+
+    def load_font(self, filepath):
+        if not os.path.exists(filepath):
+            return False
+
+        self.fonts[os.path.splitext(os.path.basename(filepath))[0]] = filepath
+        return True
+
+    def render(self, canvas):
+        canvas.render()
+
+BACKENDS = {backend.NAME: backend for backend in (TkBackend, NullBackend, CompositorBackend, PygameBackend)}
+
+def create(name):
+    if name not in BACKENDS:
+        raise BackendError('Failed to find backend %s, must be one of %s!' % (name, ', '.join(sorted(BACKENDS))))
+
+    return BACKENDS[name]()
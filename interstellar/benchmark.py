@@ -0,0 +1,259 @@
+import time
+import random
+import argparse
+from PIL import Image
+from interstellar import backend, clock, profiler, task
+
+class ScanTask(object):
+    """
+    A timer as the task manager kept them before the deadline heap, every
+    pass asks every timer whether it is due
+    """
+
+    __slots__ = ('clock', 'timestamp', 'delay')
+
+    def __init__(self, clock, delay):
+        self.clock = clock
+        self.timestamp = clock.time()
+        self.delay = delay
+
+    def run(self):
+        if self.clock.time() - self.timestamp < self.delay:
+            return task.TaskResult.WAIT
+
+        self.timestamp = self.clock.time()
+        return task.TaskResult.DONE
+
+def scan(tasks):
+    for name in list(tasks):
+        if tasks[name].run() == task.TaskResult.DONE:
+            del tasks[name]
+
+def measure(function, passes=1):
+    started = time.time()
+
+    for index in xrange(passes):
+        function()
+
+    return (time.time() - started) / passes
+
+def timers(count, delays):
+    """
+    Returns a heap and a scan scheduler each holding the same timers, both
+    run on a manual clock so only the scheduling itself is measured
+    """
+
+    manager = task.TaskManager(clock.Clock(manual=True))
+    scanned = {}
+
+    for index in xrange(count):
+        delay = delays()
+        manager.add_delayed(delay, lambda task: task.done)
+        scanned[index] = ScanTask(manager.clock, delay)
+
+    return manager, scanned
+
+def benchmark_tasks(arguments):
+    random.seed(arguments.seed)
+    print 'Scheduling %d timers, milliseconds per pass:' % arguments.count
+
+    manager, scanned = timers(arguments.count, lambda: random.uniform(0.5, 30))
+    print '  nothing due: heap %8.3f, scan %8.3f' % (measure(manager.poll, 100) * 1000,
+        measure(lambda: scan(scanned), 5) * 1000)
+
+    manager.destroy()
+    manager, scanned = timers(arguments.count, lambda: 0)
+    print '  all due:     heap %8.3f, scan %8.3f' % (measure(manager.poll) * 1000,
+        measure(lambda: scan(scanned)) * 1000)
+
+    manager.destroy()
+
+SPRITES = ('assets/asteroids/asteroid-small.png', 'assets/asteroids/asteroid-big.png', 'assets/bullet.png')
+
+def populate(canvas, create_photo_image, count, width, height):
+    """
+    Fills a canvas like a level, the starfield twice and count sprites
+    spread over it, returns the sprites and the images they show
+    """
+
+    background = create_photo_image(Image.open('assets/stars.png'))
+    images = [create_photo_image(Image.open(filepath)) for filepath in SPRITES]
+
+    canvas.create_image(width / 2, height / 2, image=background, anchor=backend.CENTER)
+    canvas.create_image(width / 2, height / 2 - background.height(), image=background, anchor=backend.CENTER)
+
+    sprites = []
+
+    for index in xrange(count):
+        x, y = random.uniform(0, width), random.uniform(0, height)
+        sprites.append([canvas.create_image(x, y, image=images[index % len(images)], anchor=backend.CENTER),
+            x, y, random.uniform(1, 25)])
+
+    return sprites, images + [background]
+
+def animate(canvas, sprites, height):
+    # the positions are kept here, reading them back would flush a batch.
+    for sprite in sprites:
+        sprite[2] = (sprite[2] + sprite[3]) % height
+        canvas.coords(sprite[0], sprite[1], sprite[2])
+
+def render_headless(count, arguments):
+    canvas = backend.NullCanvas(width=arguments.width, height=arguments.height)
+    compositor = backend.Compositor(arguments.width, arguments.height)
+    sprites, images = populate(canvas, backend.CompositorImage, count, arguments.width, arguments.height)
+
+    def frame():
+        animate(canvas, sprites, arguments.height)
+        compositor.composite(canvas.items)
+
+    return measure(frame, arguments.frames)
+
+def render(renderer, root, count, arguments):
+    canvas = renderer.create_canvas(root, width=arguments.width, height=arguments.height,
+        background='black', highlightthickness=0)
+
+    canvas.pack()
+    sprites, images = populate(canvas, renderer.create_photo_image, count, arguments.width, arguments.height)
+
+    # update_idletasks makes Tk redraw the canvas before the frame ends.
+    def frame():
+        animate(canvas, sprites, arguments.height)
+        renderer.render(canvas)
+        root.update_idletasks()
+
+    frame()
+    elapsed = measure(frame, arguments.frames)
+    canvas.destroy()
+
+    return elapsed
+
+def benchmark_compositor(arguments):
+    renderers = [backend.CompositorBackend(), backend.TkBackend()]
+
+    try:
+        root = renderers[0].create_root()
+    except renderers[0].errors as error:
+        print 'No display to open a window on (%s), only the compositing is measured.' % error
+        renderers, root = [], None
+
+    print 'Rendering %dx%d frames, milliseconds per frame:' % (arguments.width, arguments.height)
+    print '  %8s %12s' % ('sprites', 'composite') + ''.join(' %12s' % renderer.NAME for renderer in \
+        renderers)
+
+    for count in arguments.counts:
+        random.seed(arguments.seed)
+        row = [render_headless(count, arguments)]
+
+        for renderer in renderers:
+            random.seed(arguments.seed)
+            row.append(render(renderer, root, count, arguments))
+
+        print '  %8d' % count + ''.join(' %12.3f' % (elapsed * 1000) for elapsed in row)
+
+    if root:
+        root.destroy()
+
+# without a display Tcl has no canvas, this one numbers the items it makes
+# and ignores everything else so Tkinter can drive it unchanged.
+STUB_CANVAS = '''proc interstellar_item {canvas command args} {
+    if {$command eq "create"} { return [incr ::interstellar_items($canvas)] }
+}
+proc canvas {name args} {
+    set ::interstellar_items($name) 0
+    interp alias {} $name {} interstellar_item $name
+    return $name
+}
+proc destroy {args} {}'''
+
+def tcl_calls(root, tcl_profiler, create_canvas, flush, count, arguments):
+    """
+    Moves count items and swaps one item's image once per frame, returns
+    the Tcl calls and the seconds spent in Tcl per frame
+    """
+
+    canvas = create_canvas(root, width=arguments.width, height=arguments.height)
+    sprites = []
+
+    for index in xrange(count):
+        x, y = random.uniform(0, arguments.width), random.uniform(0, arguments.height)
+        sprites.append([canvas.create_image(x, y, anchor=backend.CENTER), x, y, random.uniform(1, 25)])
+
+    tcl_profiler.reset()
+
+    for frame in xrange(arguments.frames):
+        animate(canvas, sprites, arguments.height)
+
+        # like the explosion's animation, one item changes image per frame.
+        canvas.itemconfigure(sprites[frame % count][0], state=backend.NORMAL)
+
+        flush(canvas)
+        root.update_idletasks()
+        tcl_profiler.step()
+
+    calls, elapsed = tcl_profiler.calls, tcl_profiler.elapsed
+    canvas.destroy()
+
+    return calls, elapsed
+
+def benchmark_canvas(arguments):
+    import Tkinter
+    from interstellar import tkcanvas
+
+    renderer = backend.TkBackend()
+
+    try:
+        root = renderer.create_root()
+    except renderer.errors as error:
+        print 'No display to open a window on (%s), the canvas is a stub.' % error
+        root = Tkinter.Tcl()
+        root.tk.eval(STUB_CANVAS)
+
+    tcl_profiler = profiler.TclProfiler.attach(root, arguments.frames)
+    canvases = (('plain', Tkinter.Canvas, lambda canvas: None), ('batched', tkcanvas.BatchedCanvas,
+        renderer.render))
+
+    print 'Tcl calls and milliseconds per frame over %d frames:' % arguments.frames
+    print '  %8s' % 'sprites' + ''.join(' %10s %10s' % (name, 'ms') for name, create_canvas, flush in \
+        canvases)
+
+    for count in arguments.counts:
+        row = []
+
+        for name, create_canvas, flush in canvases:
+            random.seed(arguments.seed)
+            row.extend(tcl_calls(root, tcl_profiler, create_canvas, flush, count, arguments))
+
+        print '  %8d' % count + ''.join(' %10.1f %10.3f' % (calls, elapsed * 1000) for calls, elapsed in \
+            zip(row[::2], row[1::2]))
+
+    root.destroy()
+
+def main():
+    parser = argparse.ArgumentParser(description='Measures the game\'s hot paths in isolation.')
+    parser.add_argument('--seed', type=int, default=0)
+
+    benchmarks = parser.add_subparsers()
+
+    tasks = benchmarks.add_parser('tasks', help='the task scheduler against a full scan of every timer')
+    tasks.add_argument('--count', type=int, default=100000)
+    tasks.set_defaults(function=benchmark_tasks)
+
+    compositor = benchmarks.add_parser('compositor', help='the compositor against the per item Tk canvas')
+    compositor.add_argument('--counts', type=int, nargs='+', default=[35, 100, 300, 1000])
+    compositor.add_argument('--frames', type=int, default=60)
+    compositor.add_argument('--width', type=int, default=1280)
+    compositor.add_argument('--height', type=int, default=720)
+    compositor.set_defaults(function=benchmark_compositor)
+
+    canvas = benchmarks.add_parser('canvas', help='Tcl calls made by a plain and a batched Tk canvas')
+    canvas.add_argument('--counts', type=int, nargs='+', default=[38, 100, 300])
+    canvas.add_argument('--frames', type=int, default=600)
+    canvas.add_argument('--width', type=int, default=1280)
+    canvas.add_argument('--height', type=int, default=720)
+    canvas.set_defaults(function=benchmark_canvas)
+
+    arguments = parser.parse_args()
+    arguments.function(arguments)
+
+if __name__ == '__main__':
+    main()
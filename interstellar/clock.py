@@ -0,0 +1,107 @@
+import time
+
+class ClockError(RuntimeError):
+    """
+    A clock specific runtime error
+    """
+
+class Clock(object):
+    """
+    The simulation time shared by every timer, it can be paused, scaled
+    or advanced by hand with `step` when in manual mode. Watchers are called
+    whenever the clock changes speed or starts or stops moving.
+    """
+
+    def __init__(self, scale=1.0, manual=False):
+        self._manual = manual
+        self.paused = False
+        self.watchers = []
+
+        # the elapsed simulation time and the real time it was taken at are
+        # swapped as one tuple so the task thread never sees half an update.
+        self._scale = scale
+        self._state = (0.0, time.time())
+
+    @property
+    def scale(self):
+        return self._scale
+
+    @scale.setter
+    def scale(self, scale):
+        if scale <= 0:
+            raise ClockError('Failed to set clock scale %r, must be positive!' % scale)
+
+        self.rebase()
+        self._scale = scale
+        self.changed()
+
+    @property
+    def manual(self):
+        return self._manual
+
+    @manual.setter
+    def manual(self, manual):
+        self.rebase()
+        self._manual = manual
+        self.changed()
+
+    @property
+    def stopped(self):
+        return self.paused or self._manual
+
+    def time(self):
+        elapsed, timestamp = self._state
+
+        if self.paused or self._manual:
+            return elapsed
+
+        return elapsed + (time.time() - timestamp) * self._scale
+
+    def real(self, seconds):
+        """
+        Converts simulation seconds into real seconds, returns None when the
+        clock is not moving on its own
+        """
+
+        if seconds is None or self.stopped:
+            return None
+
+        return seconds / self._scale
+
+    def watch(self, watcher):
+        self.watchers.append(watcher)
+
+    def unwatch(self, watcher):
+        if watcher in self.watchers:
+            self.watchers.remove(watcher)
+
+    def changed(self):
+        # anyone sleeping until a deadline worked out at the old rate has to
+        # work it out again.
+        for watcher in list(self.watchers):
+            watcher()
+
+    def rebase(self):
+        self._state = (self.time(), time.time())
+
+    def pause(self):
+        if self.paused:
+            return
+
+        self.rebase()
+        self.paused = True
+        self.changed()
+
+    def resume(self):
+        if not self.paused:
+            return
+
+        self._state = (self._state[0], time.time())
+        self.paused = False
+        self.changed()
+
+    def step(self, seconds):
+        if not self._manual:
+            raise ClockError('Failed to step clock, not in manual mode!')
+
+        self._state = (self._state[0] + seconds, time.time())
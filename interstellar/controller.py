@@ -6,6 +6,10 @@ JOYBUTTONDOWN = pygame.JOYBUTTONDOWN
 JOYBUTTONUP = pygame.JOYBUTTONUP
 JOYHATMOTION = pygame.JOYHATMOTION
 
+# only the joystick events are taken off the queue, the pygame renderer reads
+# the keyboard and mouse events from it.
+JOYEVENTS = (JOYAXISMOTION, JOYBALLMOTION, JOYBUTTONDOWN, JOYBUTTONUP, JOYHATMOTION)
+
 JOYBUTTON_Y = 0x00
 JOYBUTTON_B = 0x01
 JOYBUTTON_A = 0x02
@@ -45,7 +49,7 @@ class Controller(object):
         self.load_joysticks()
 
     def update(self):
-        for event in pygame.event.get():
+        for event in pygame.event.get(JOYEVENTS):
             if event.type == JOYBUTTONDOWN:
                 self.button_down(event.button)
             elif event.type == JOYBUTTONUP:
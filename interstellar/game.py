@@ -1,12 +1,14 @@
 import time
-import _tkinter
-import Tkinter
-from interstellar import audio, resource, task
+from interstellar import atlas, audio, backend, clock, node, profiler, resource, task
 
 class GameDisplay(object):
 
-    def __init__(self):
-        self.root = Tkinter.Tk(sync=True)
+    def __init__(self, backend):
+        self.backend = backend
+        self.root = backend.create_root()
+        self.canvas = None
+        self.labels = []
+        self.items = {}
         self._width = 0
         self._height = 0
         self._x = 0
@@ -124,19 +126,177 @@ class GameDisplay(object):
         self._icon_filename = icon_filename
         self.root.iconbitmap(icon_filename)
 
+    def visible(self, x, y, width, height):
+        """
+        Returns whether a rectangle centered on x, y shows any part of
+        itself inside of the window
+        """
+
+        return x + width / 2 > 0 and x - width / 2 < self._width and y + height / 2 > 0 and \
+            y - height / 2 < self._height
+
     def setup(self):
         self.root.configure(background='black')
 
+        # every scene draws on the same canvas, switching scenes only clears it.
+        self.canvas = self.backend.create_canvas(self.root, width=self.width, height=self.height,
+            background='black', highlightthickness=0)
+
+        self.canvas.pack(fill=backend.BOTH, expand=True, anchor=backend.CENTER)
+
+    def clear(self):
+        self.canvas.delete('all')
+        self.items = {}
+
+    def acquire_item(self, master, key, x, y, image):
+        """
+        Shows a hidden image item from the pool of the given image type,
+        a new item is only created when the pool is empty
+        """
+
+        items = self.items.get(key) if master is self.canvas else None
+
+        if not items:
+            return master.create_image(x, y, image=image, anchor=backend.CENTER)
+
+        item = items.pop()
+        master.coords(item, x, y)
+
+        # the texture may have been freed and made again since the item was
+        # hidden, always point it at the current one.
+        master.itemconfigure(item, image=image, state=backend.NORMAL)
+
+        return item
+
+    def release_item(self, master, key, item):
+        if master is not self.canvas:
+            return master.delete(item)
+
+        master.itemconfigure(item, state=backend.HIDDEN)
+        self.items.setdefault(key, []).append(item)
+
+    def reserve_items(self, key, image, count):
+        items = self.items.setdefault(key, [])
+
+        for index in xrange(count - len(items)):
+            items.append(self.canvas.create_image(0, 0, image=image, anchor=backend.CENTER,
+                state=backend.HIDDEN))
+
+    def acquire_label(self, master, **options):
+        """
+        Returns a label widget from the pool, labels are only pooled when
+        they are placed on the shared canvas
+        """
+
+        if master is not self.canvas or not self.labels:
+            return self.backend.create_label(master, **options)
+
+        label = self.labels.pop()
+        label.configure(**options)
+
+        return label
+
+    def release_label(self, label):
+        if label.master is not self.canvas:
+            return label.destroy()
+
+        label.place_forget()
+        self.labels.append(label)
+
+    def render(self):
+        self.backend.render(self.canvas)
+
     def update(self):
         self.root.update()
 
     def destroy(self):
+        for label in self.labels:
+            label.destroy()
+
+        self.labels = []
+        self.items = {}
+
+        if self.canvas:
+            self.canvas.destroy()
+
+        self.canvas = None
         self.root.destroy()
 
-class Game(object):
+class GameFrameTimings(object):
+    """
+    The cost of the last few frames kept in a fixed size ring buffer, one
+    list per column so recording a frame never allocates
+    """
+
+    SIZE = 256
+    COLUMNS = ('interval', 'frame', 'tasks', 'scene', 'display', 'idle')
+
+    def __init__(self, size=SIZE):
+        self.size = size
+        self.index = 0
+        self.count = 0
+        self.columns = {column: [0.0] * size for column in self.COLUMNS}
+
+    def record(self, interval, frame, tasks, scene, display, idle):
+        index = self.index
+        columns = self.columns
+
+        columns['interval'][index] = interval
+        columns['frame'][index] = frame
+        columns['tasks'][index] = tasks
+        columns['scene'][index] = scene
+        columns['display'][index] = display
+        columns['idle'][index] = idle
+
+        self.index = (index + 1) % self.size
+        self.count = min(self.count + 1, self.size)
+
+    def values(self, column):
+        return self.columns[column][:self.count]
+
+    def average(self, column):
+        if not self.count:
+            return 0.0
+
+        return sum(self.values(column)) / self.count
+
+    def percentile(self, column, percent):
+        if not self.count:
+            return 0.0
 
-    def __init__(self, scene, width=1280, height=720, caption='Interstellar'):
-        self.display = GameDisplay()
+        values = sorted(self.values(column))
+        return values[min(int(self.count * percent / 100.0), self.count - 1)]
+
+    @property
+    def fps(self):
+        interval = self.average('interval')
+        return 1.0 / interval if interval else 0.0
+
+    def reset(self):
+        self.index = 0
+        self.count = 0
+
+class Game(object):
+    # the simulation always advances in ticks of the same length, frames are
+    # rendered as often as the frame rate allows.
+    TICK_RATE = 30
+    FRAME_RATE = 60
+    MAXIMUM_FRAME = 0.25
+
+    # tasks run on their own thread, in the frame loop or from Tk's after().
+    SCHEDULER_THREAD = 'thread'
+    SCHEDULER_FRAME = 'frame'
+    SCHEDULER_TK = 'tk'
+
+    # built with `python -m interstellar.atlas` whenever the images change.
+    ATLAS = 'assets/atlas'
+
+    def __init__(self, scene, width=1280, height=720, caption='Interstellar', scheduler=SCHEDULER_THREAD,
+        frame_rate=FRAME_RATE, renderer=backend.TkBackend.NAME, profile_tcl=False):
+        self.display = GameDisplay(backend.create(renderer))
+
+        # counting has to start before the canvas or any label is created.
+        self.tcl_profiler = profiler.TclProfiler.attach(self.display.root) if profile_tcl else None
         self.display.size = (width, height)
         self.display.caption = caption
         self.display.position = self.display.root.winfo_screenwidth() / 2 - self.display.width / 2, \
@@ -144,49 +304,171 @@ class Game(object):
 
         self.display.resizable = False
         self.display.icon = 'assets/icon.ico'
-        self.task_manager = task.TaskManager()
+        self.scheduler = scheduler
+        self.frame_rate = frame_rate
+        self.clock = clock.Clock()
+        self.tick_time = 1.0 / self.TICK_RATE
+        self.timestamp = self.clock.time()
+        self.accumulator = 0.0
+        self.frame_timings = GameFrameTimings()
+        self.frame_started = None
+        self.show_overlay = False
+        self.interpolator = resource.ResourceInterpolator()
+        self.graph = node.NodeGraph()
+        self.task_manager = task.TaskManager(self.clock)
         self.audio_manager = audio.AudioManager()
-        self.score_board = resource.ResourceScoreBoard()
+        self.score_board = resource.ResourceScoreBoard(self.task_manager)
+        self.atlas = atlas.Atlas(self.ATLAS)
+        self.textures = resource.ResourceTextureCache()
+        self.preloader = resource.ResourcePreloader(self.task_manager)
         self.shutdown = False
         self.last_scene = None
-        self.current_scene = scene(self, self.display)
+        self.current_scene = None
+
+        # the first scene is built in setup, its resources reach the backend
+        # through the game builtin which is only assigned once we return.
+        self.first_scene = scene
+
+    @property
+    def frame_budget(self):
+        return 1.0 / self.frame_rate
 
     def switch_scene(self, scene, *args, **kwargs):
         if self.current_scene:
             self.current_scene.destroy()
             self.last_scene = self.current_scene
 
+        # whatever the new scene does not use is released, if it was warmed
+        # by the previous scene most of its images are decoded already.
+        self.preloader.retain(scene.manifest())
         self.current_scene = scene(self, self.display, *args, **kwargs)
         self.current_scene.setup()
 
     def setup(self):
         self.display.setup()
-        self.current_scene.setup()
+        self.switch_scene(self.first_scene)
 
     def update(self):
-        if self.current_scene.active:
-            self.current_scene.update()
+        now = self.clock.time()
+
+        # a long stall is not caught up on all at once, the game just slows.
+        self.accumulator += min(now - self.timestamp, self.MAXIMUM_FRAME * self.clock.scale)
+        self.timestamp = now
+
+        while self.accumulator >= self.tick_time:
+            self.accumulator -= self.tick_time
+            self.interpolator.tick()
+
+            if self.current_scene.active:
+                self.current_scene.update()
+
+            # children are placed before the next tick so they are drawn in
+            # step with whatever they are attached to.
+            self.graph.flush()
 
         self.current_scene.explicit_update()
+        self.current_scene.overlay.refresh()
+        self.interpolator.render(self.accumulator / self.tick_time)
+        self.display.render()
 
     def destroy(self):
         self.current_scene.destroy()
+        self.score_board.destroy()
+        self.preloader.destroy()
+        self.textures.destroy()
+        self.atlas.destroy()
+        self.task_manager.destroy()
+        self.interpolator.destroy()
+        self.graph.destroy()
         self.audio_manager.destroy()
         self.display.destroy()
 
     def execute(self):
+        started = time.time()
+
+        # the tasks share the frame loop, there is no second thread polling
+        # for due tasks.
+        if self.scheduler == self.SCHEDULER_FRAME:
+            self.task_manager.poll()
+
+        self.task_manager.drain()
+        tasks_done = time.time()
         self.update()
-        self.display.update()
+        scene_done = time.time()
+
+        # Tk's own event loop is already processing the display.
+        if self.scheduler != self.SCHEDULER_TK:
+            self.display.update()
+
+        display_done = time.time()
+
+        # whatever is left of the frame budget goes to the idle work.
+        self.task_manager.run_idle(started + self.frame_budget)
+        idle_done = time.time()
+
+        interval = started - self.frame_started if self.frame_started else 0.0
+        self.frame_started = started
+
+        # the idle work fills the spare budget on purpose, it is not part of
+        # what the frame cost.
+        self.frame_timings.record(interval, display_done - started, tasks_done - started,
+            scene_done - tasks_done, display_done - scene_done, idle_done - display_done)
+
+        if self.tcl_profiler:
+            self.tcl_profiler.step()
+
+    def step(self):
+        if self.shutdown:
+            return self.display.root.quit()
+
+        started = time.time()
+
+        try:
+            self.execute()
+        except self.display.backend.errors + (SystemExit,):
+            return self.display.root.quit()
+
+        delay = int((started + self.frame_budget - time.time()) * 1000)
+        self.display.root.after(max(delay, 1), self.step)
+
+    def close(self):
+        self.shutdown = True
 
     def mainloop(self):
-        self.task_manager.run()
+        # closing the window only ends the game once, whichever loop is running.
+        self.display.root.protocol('WM_DELETE_WINDOW', self.close)
+
+        if self.scheduler == self.SCHEDULER_TK:
+            return self.after_mainloop()
+
+        if self.scheduler == self.SCHEDULER_THREAD:
+            self.task_manager.run()
 
         while not self.shutdown:
+            started = time.time()
+
             try:
                 self.execute()
-            except (_tkinter.TclError, KeyboardInterrupt, SystemExit):
+            except self.display.backend.errors + (KeyboardInterrupt, SystemExit):
                 break
 
-            #time.sleep(0.01)
+            # sleep off the rest of the frame instead of spinning.
+            remaining = started + self.frame_budget - time.time()
+
+            if remaining > 0:
+                time.sleep(remaining)
+
+        self.destroy()
+
+    def after_mainloop(self):
+        # both the frame step and the tasks are after callbacks, nothing polls
+        # and Tk sleeps in between them.
+        self.task_manager.attach(self.display.root)
+        self.display.root.after_idle(self.step)
+
+        try:
+            self.display.root.mainloop()
+        except KeyboardInterrupt:
+            pass
 
         self.destroy()
@@ -1,16 +1,37 @@
+import os
+import argparse
 import __builtin__
 import pygame
-from interstellar import game, scene
+from interstellar import backend, game, scene
 
 def main():
+    parser = argparse.ArgumentParser(description='A RTS Space War Simulator.')
+    parser.add_argument('--renderer', choices=sorted(backend.BACKENDS), default=backend.TkBackend.NAME)
+    parser.add_argument('--scheduler', choices=[game.Game.SCHEDULER_THREAD, game.Game.SCHEDULER_FRAME,
+        game.Game.SCHEDULER_TK], default=game.Game.SCHEDULER_THREAD)
+    parser.add_argument('--profile-tcl', action='store_true', help='count the Tcl calls made every frame')
+
+    arguments = parser.parse_args()
+
+    # the null renderer runs without a display or sound card.
+    if arguments.renderer == backend.NullBackend.NAME:
+        os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+        os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+
     pygame.display.init()
     pygame.mixer.init(44100, size=-16, channels=2, buffer=1024)
     pygame.mixer.set_num_channels(16)
     pygame.joystick.init()
 
-    __builtin__.game = game.Game(scene.MainMenu)
-    game.setup()
-    game.mainloop()
+    # the module shadows the builtin inside this file, go through __builtin__.
+    __builtin__.game = game.Game(scene.MainMenu, scheduler=arguments.scheduler, renderer=arguments.renderer,
+        profile_tcl=arguments.profile_tcl)
+
+    __builtin__.game.setup()
+    __builtin__.game.mainloop()
+
+    if __builtin__.game.tcl_profiler:
+        print __builtin__.game.tcl_profiler.report()
 
 if __name__ == '__main__':
-    main()
\ No newline at end of file
+    main()
@@ -13,18 +13,22 @@ class Mechanism(node.Node):
     NAME = None
     PROBABILITY = 0
 
-    def __init__(self, parent):
+    def __init__(self, parent, scene):
         super(Mechanism, self).__init__(parent)
 
+        self.scene = scene
         self.delay = 0
 
     def setup(self):
-        game.task_manager.add_delayed(self.delay, lambda task: self.destroy())
+        # the scene's tasks are cancelled with it.
+        self.scene.task_group.add_delayed(self.delay, self.expire)
 
-    def update(self):
-        pass
+    def expire(self, task):
+        # runs on the task thread, destroying the mechanism touches the canvas.
+        self.scene.task_group.post(self.destroy)
+        return task.done
 
-    def move(self, x, y):
+    def update(self):
         pass
 
     def destroy(self):
@@ -34,12 +38,14 @@ class Mechanism(node.Node):
 class ShieldMechanism(Mechanism):
     NAME = 'Shield'
 
-    def __init__(self, parent):
-        super(ShieldMechanism, self).__init__(parent)
+    def __init__(self, parent, scene):
+        super(ShieldMechanism, self).__init__(parent, scene)
 
-        self.image = resource.ResourceImage(parent._parent, 'assets/shield.png')
-        self.image.position = (parent.x, parent.y)
-        self.image.render(self._parent._parent.canvas)
+        self.image = resource.ResourceImage(scene.root, 'assets/shield.png')
+
+        # the shield is centered on the ship and follows it from now on.
+        parent.image.attach(self.image)
+        self.image.render(scene.canvas)
 
         self.delay = 15
 
@@ -48,9 +54,6 @@ class ShieldMechanism(Mechanism):
 
         super(ShieldMechanism, self).setup()
 
-    def move(self, x, y):
-        self.image.position = (x, y)
-
     def destroy(self):
         self._parent.can_damage = True
 
@@ -64,8 +67,8 @@ class ShieldMechanism(Mechanism):
 class InstantKillMechanism(Mechanism):
     NAME = 'InstantKill'
 
-    def __init__(self, parent):
-        super(InstantKillMechanism, self).__init__(parent)
+    def __init__(self, parent, scene):
+        super(InstantKillMechanism, self).__init__(parent, scene)
 
         self.delay = 7
         self.previous_damage = parent.damage
@@ -84,8 +87,8 @@ class InstantKillMechanism(Mechanism):
 class FullHealthMechanism(Mechanism):
     NAME = 'FullHealth'
 
-    def __init__(self, parent):
-        super(FullHealthMechanism, self).__init__(parent)
+    def __init__(self, parent, scene):
+        super(FullHealthMechanism, self).__init__(parent, scene)
 
         self.delay = 0
 
@@ -97,8 +100,8 @@ class FullHealthMechanism(Mechanism):
 class DoubleHealthMechanism(Mechanism):
     NAME = 'DoubleHealth'
 
-    def __init__(self, parent):
-        super(DoubleHealthMechanism, self).__init__(parent)
+    def __init__(self, parent, scene):
+        super(DoubleHealthMechanism, self).__init__(parent, scene)
 
         self.delay = 0
 
@@ -1,17 +1,45 @@
+import collections
 
 class NodeError(RuntimeError):
     """
     A node specific runtime error
     """
 
+class NodeGraph(object):
+    """
+    Keeps the nodes whose children have to follow them, their world
+    positions are all worked out in one pass instead of on every move
+    """
+
+    def __init__(self):
+        self.dirty = collections.deque()
+
+    def invalidate(self, node):
+        self.dirty.append(node)
+
+    def flush(self):
+        dirty = self.dirty
+
+        # moving a child may dirty its own children, they join the same pass.
+        while dirty:
+            node = dirty.popleft()
+
+            if node.dirty:
+                node.dirty = False
+                node.place_children()
+
+    def destroy(self):
+        self.dirty.clear()
+
 class Node(object):
     """
     An object that exists in the application which has special properties...
     """
 
-    __slots__ = ('_parent', '_id', '_x', '_y', '_width', '_height', '_rotation')
+    __slots__ = ('_parent', '_id', '_x', '_y', '_width', '_height', '_rotation', 'graph', 'owner',
+        'children', 'offset_x', 'offset_y', 'dirty')
 
-    def __init__(self, parent=None):
+    def __init__(self, parent=None, graph=None):
         self._parent = parent
         self._id = None
         self._x = 0
@@ -20,6 +48,15 @@ class Node(object):
         self._height = 0
         self._rotation = 0
 
+        # the parent is whatever the node is drawn on, the owner is the node
+        # it is positioned relative to, the graph places a moved owner's children.
+        self.graph = graph
+        self.owner = None
+        self.children = []
+        self.offset_x = 0
+        self.offset_y = 0
+        self.dirty = False
+
     @property
     def parent(self):
         return self._parent
@@ -56,6 +93,42 @@ class Node(object):
     def rotation(self):
         return self._rotation
 
+    def attach(self, child, offset_x=0, offset_y=0):
+        """
+        Makes a child follow this node at the given offset, the child is
+        placed straight away and then whenever this node moves
+        """
+
+        if not self.graph:
+            raise NodeError('Cannot attach to a node without a graph!')
+
+        if child.owner:
+            raise NodeError('Already attached to owner!')
+
+        child.owner = self
+        child.offset_x = offset_x
+        child.offset_y = offset_y
+        child.position = (self._x + offset_x, self._y + offset_y)
+
+        self.children.append(child)
+
+    def detach(self, child):
+        if child.owner is not self:
+            raise NodeError('Cannot detach node from invalid owner!')
+
+        child.owner = None
+        self.children.remove(child)
+
+    def invalidate(self):
+        # called whenever the node moves, nothing is queued without children.
+        if self.children and not self.dirty:
+            self.dirty = True
+            self.graph.invalidate(self)
+
+    def place_children(self):
+        for child in self.children:
+            child.position = (self._x + child.offset_x, self._y + child.offset_y)
+
     def setup(self):
         pass
 
@@ -63,6 +136,14 @@ class Node(object):
         pass
 
     def destroy(self):
+        if self.owner:
+            self.owner.detach(self)
+
+        for child in self.children:
+            child.owner = None
+
+        self.children = []
+        self.dirty = False
         self._parent = None
         self._id = None
         self._x = 0
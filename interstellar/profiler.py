@@ -0,0 +1,184 @@
+import sys
+import time
+import collections
+
+class ProfilerError(RuntimeError):
+    """
+    A profiler specific runtime error
+    """
+
+class TclProfiler(object):
+    """
+    Stands in for a Tk interpreter and counts the calls made through it,
+    every call is timed and grouped by command and by the module it came
+    from, the last few frames are kept as rolling statistics
+    """
+
+    SIZE = 120
+
+    # commands whose second word says what they actually do.
+    ENSEMBLES = ('winfo', 'wm', 'place', 'pack', 'event', 'image', 'font', 'update')
+
+    def __init__(self, interpreter, size=SIZE):
+        self.interpreter = interpreter
+        self.size = size
+        self.current = {}
+        self.frames = collections.deque()
+        self.totals = {}
+
+    @classmethod
+    def attach(cls, root, size=SIZE):
+        """
+        Replaces the interpreter of a Tk root, widgets copy the interpreter
+        of their master so this has to happen before any are created
+        """
+
+        import _tkinter
+        interpreter = getattr(root, 'tk', None)
+
+        if not isinstance(interpreter, _tkinter.TkappType):
+            raise ProfilerError('Failed to attach the Tcl profiler, %s has no Tcl interpreter!' % \
+                type(root).__name__)
+
+        root.tk = cls(interpreter, size)
+        return root.tk
+
+    def __getattr__(self, name):
+        # anything which does not run a Tcl command goes straight through.
+        return getattr(self.interpreter, name)
+
+    def call(self, *args):
+        started = time.time()
+
+        try:
+            return self.interpreter.call(*args)
+        finally:
+            self.record(self.command(args), time.time() - started)
+
+    def eval(self, script):
+        started = time.time()
+
+        try:
+            return self.interpreter.eval(script)
+        finally:
+            self.record('eval', time.time() - started)
+
+    def command(self, args):
+        # Tkinter passes the words either one by one or as a single tuple.
+        if len(args) == 1 and isinstance(args[0], tuple):
+            args = args[0]
+
+        if not args:
+            return ''
+
+        command = str(args[0])
+
+        # widget commands are named after the widget, keep the subcommand.
+        if command.startswith('.'):
+            return str(args[1]) if len(args) > 1 else command
+
+        if command in self.ENSEMBLES and len(args) > 1:
+            return '%s %s' % (command, args[1])
+
+        return command
+
+    def caller(self):
+        frame = sys._getframe(3)
+
+        # skip Tkinter, tkFont and PIL until the game's own code is reached.
+        while frame:
+            name = frame.f_globals.get('__name__', '')
+
+            if name.startswith('interstellar.') and name != __name__:
+                return name.split('.', 1)[1]
+
+            frame = frame.f_back
+
+        return 'tk'
+
+    def record(self, command, elapsed):
+        key = (self.caller(), command)
+        entry = self.current.get(key)
+
+        if entry:
+            entry[0] += 1
+            entry[1] += elapsed
+        else:
+            self.current[key] = [1, elapsed]
+
+    def step(self):
+        """
+        Closes the current frame, called once at the end of every frame
+        """
+
+        frame, self.current = self.current, {}
+        self.frames.append(frame)
+        self.add(frame, 1)
+
+        if len(self.frames) > self.size:
+            self.add(self.frames.popleft(), -1)
+
+    def add(self, frame, sign):
+        totals = self.totals
+
+        for key, (calls, elapsed) in frame.iteritems():
+            entry = totals.setdefault(key, [0, 0.0])
+            entry[0] += calls * sign
+            entry[1] += elapsed * sign
+
+            if not entry[0]:
+                del totals[key]
+
+    def statistics(self, group=None):
+        """
+        Returns (name, calls, seconds) per frame averaged over the frames
+        kept, grouped by module, by command or by both when group is None
+        """
+
+        count = len(self.frames)
+
+        if not count:
+            return []
+
+        grouped = {}
+
+        for (module, command), (calls, elapsed) in self.totals.iteritems():
+            name = module if group == 'module' else command if group == 'command' else \
+                '%s: %s' % (module, command)
+
+            entry = grouped.setdefault(name, [0, 0.0])
+            entry[0] += calls
+            entry[1] += elapsed
+
+        return sorted(((name, calls / float(count), elapsed / count) for name, (calls, elapsed) in \
+            grouped.iteritems()), key=lambda entry: (-entry[1], entry[0]))
+
+    @property
+    def calls(self):
+        if not self.frames:
+            return 0.0
+
+        return sum(calls for calls, elapsed in self.totals.itervalues()) / float(len(self.frames))
+
+    @property
+    def elapsed(self):
+        if not self.frames:
+            return 0.0
+
+        return sum(elapsed for calls, elapsed in self.totals.itervalues()) / len(self.frames)
+
+    def report(self, count=10):
+        lines = ['Tcl calls per frame: %.1f (%.3f ms) over %d frames' % (self.calls, self.elapsed * 1000,
+            len(self.frames))]
+
+        for group in ('module', 'command', None):
+            lines.append('')
+            lines.extend('%8.1f %8.3f ms  %s' % (calls, elapsed * 1000, name) for name, calls, elapsed in \
+                self.statistics(group)[:count])
+
+        return '\n'.join(lines)
+
+    def reset(self):
+        self.current = {}
+        self.frames.clear()
+        self.totals = {}
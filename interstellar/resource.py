@@ -1,37 +1,275 @@
 import os
-import random
 import time
+import random
 import pygame
-import Tkinter
-import tkFont
-import _tkinter
 import zlib
 import json
-from PIL import Image, ImageTk
-from interstellar import node, util, audio
+import collections
+from PIL import Image
+from interstellar import backend, node, audio, task
 
 class ResourceImageError(node.NodeError):
     """
     A resource image specific runtime error
     """
 
+class ResourceInterpolator(object):
+    """
+    Draws moving images part way between their last two simulation ticks
+    so motion stays smooth when frames and ticks are out of step
+    """
+
+    def __init__(self):
+        self.ticks = 0
+        self.images = set()
+
+    def track(self, image):
+        self.images.add(image)
+
+    def tick(self):
+        self.ticks += 1
+
+    def render(self, alpha):
+        for image in list(self.images):
+            if not image.parent:
+                self.images.discard(image)
+                continue
+
+            # the image did not move during the last tick, settle it in place.
+            if image.tick != self.ticks:
+                image.draw(image.x, image.y)
+                self.images.discard(image)
+                continue
+
+            image.draw(image.previous_x + (image.x - image.previous_x) * alpha,
+                image.previous_y + (image.y - image.previous_y) * alpha)
+
+    def destroy(self):
+        self.ticks = 0
+        self.images = set()
+
+class ResourceTextureCache(object):
+    """
+    The photo images shared by every ResourceImage, keyed by path and variant
+    and freed once nothing holds a reference to them anymore, unused variants
+    are kept around up to a fixed capacity and evicted least recently used
+    """
+
+    CAPACITY = 256
+
+    def __init__(self, capacity=CAPACITY):
+        self.textures = {}
+        self.unused = collections.OrderedDict()
+        self.capacity = capacity
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self):
+        return len(self.textures)
+
+    def acquire(self, filepath, variant=None, transform=None):
+        key = (filepath, variant)
+        entry = self.textures.get(key)
+
+        if entry:
+            entry[1] += 1
+            self.hits += 1
+
+            return entry[0]
+
+        photo_image = self.unused.pop(key, None)
+
+        if photo_image:
+            self.textures[key] = [photo_image, 1]
+            self.hits += 1
+
+            return photo_image
+
+        self.misses += 1
+
+        # variants are made from the decoded image, e.g. a rotated copy.
+        image = game.preloader.image(filepath)
+
+        if transform:
+            image = transform(image)
+
+        photo_image = game.display.backend.create_photo_image(image)
+        self.textures[key] = [photo_image, 1]
+
+        return photo_image
+
+    def release(self, filepath, variant=None):
+        key = (filepath, variant)
+        entry = self.textures.get(key)
+
+        if not entry:
+            return
+
+        entry[1] -= 1
+
+        if entry[1] > 0:
+            return
+
+        del self.textures[key]
+
+        # a rotating image comes back to the same variants over and over, only
+        # the plain images are freed straight away.
+        if variant is None:
+            return
+
+        self.unused[key] = entry[0]
+
+        if len(self.unused) > self.capacity:
+            self.unused.popitem(last=False)
+            self.evictions += 1
+
+    def warm(self, filepath, variant, transform):
+        if (filepath, variant) in self.textures or (filepath, variant) in self.unused:
+            return
+
+        self.acquire(filepath, variant, transform)
+        self.release(filepath, variant)
+
+    def destroy(self):
+        self.textures = {}
+        self.unused = collections.OrderedDict()
+
+class ResourcePreloader(object):
+    """
+    Decodes the images a scene declares in its manifest on the task executor
+    while the previous scene is still showing, so building the scene does not
+    stall on png decoding
+    """
+
+    def __init__(self, task_manager):
+        self.task_manager = task_manager
+        self.images = {}
+        self.textures = set()
+        self.pending = set()
+        self.converting = False
+
+    def preload(self, filepaths):
+        for filepath in filepaths:
+            if filepath in self.pending or filepath in self.images:
+                continue
+
+            self.pending.add(filepath)
+            self.task_manager.submit(self.decode, filepath, callback=self.decoded)
+
+    def decode(self, filepath):
+        # runs on the executor thread, nothing in here may touch Tk.
+        if not self.exists(filepath):
+            return filepath, None
+
+        return filepath, self.open(filepath)
+
+    def decoded(self, result):
+        filepath, image = result
+
+        # the image was released by a scene switch while it was decoding.
+        if filepath not in self.pending:
+            return
+
+        self.pending.discard(filepath)
+
+        if not image:
+            return
+
+        self.images[filepath] = image
+
+        # photo images can only be made on the Tk thread, they are put in the
+        # texture cache in the spare frame budget instead of when the scene
+        # is built.
+        if not self.converting:
+            self.converting = True
+            self.task_manager.add_idle(self.convert)
+
+    def convert(self, deadline):
+        for filepath, image in self.images.items():
+            if deadline.time_remaining <= 0:
+                return task.TaskResult.CONT
+
+            # the preloader holds a reference until the image is released so
+            # bullets and asteroids never free and decode it again.
+            if filepath not in self.textures:
+                game.textures.acquire(filepath)
+                self.textures.add(filepath)
+
+        self.converting = False
+        return task.TaskResult.DONE
+
+    def exists(self, filepath):
+        return game.atlas.has(filepath) or os.path.exists(filepath)
+
+    def open(self, filepath):
+        # packed images are cut out of their atlas sheet, which is only
+        # opened and decoded once for all of them.
+        if game.atlas.has(filepath):
+            return game.atlas.image(filepath)
+
+        image = Image.open(filepath)
+        image.load()
+
+        return image
+
+    def image(self, filepath):
+        return self.images.get(filepath) or self.open(filepath)
+
+    def retain(self, filepaths):
+        """
+        Releases every image which is not in the given manifest
+        """
+
+        filepaths = set(filepaths)
+
+        for filepath in self.images.keys():
+            if filepath not in filepaths:
+                del self.images[filepath]
+
+        for filepath in list(self.textures - filepaths):
+            self.textures.discard(filepath)
+            game.textures.release(filepath)
+
+        self.pending &= filepaths
+
+    def destroy(self):
+        for filepath in self.textures:
+            game.textures.release(filepath)
+
+        self.images = {}
+        self.textures = set()
+        self.pending = set()
+
 class ResourceImage(node.Node):
     """
     A image object that manages and renders images to a canvas
     """
 
-    __slots__ = ('root', '_parent', '_id', 'filepath', 'image', '_x', '_y',
-        '_width', '_height')
+    __slots__ = ('root', '_parent', '_id', 'filepath', 'variant', 'image', '_x', '_y',
+        '_width', '_height', '_rotation', '_scale', 'previous_x', 'previous_y', 'tick', 'visible')
+
+    # rotations are rounded to the nearest step so a tumbling image only
+    # ever needs this many textures.
+    ROTATION_STEPS = 32
 
     def __init__(self, root, filepath):
-        super(ResourceImage, self).__init__()
+        super(ResourceImage, self).__init__(graph=game.graph)
 
-        if not os.path.exists(filepath):
+        if not game.preloader.exists(filepath):
             raise ResourceImageError('Failed to load image %s!' % filepath)
 
         self.root = root
         self.filepath = filepath
-        self.image = ImageTk.PhotoImage(Image.open(filepath))
+        self.variant = None
+        self.image = game.textures.acquire(filepath)
+        self._width = self.image.width()
+        self._height = self.image.height()
+        self._scale = 1
+        self.previous_x = 0
+        self.previous_y = 0
+        self.tick = None
+        self.visible = False
 
     @node.Node.parent.setter
     def parent(self, parent):
@@ -41,16 +279,24 @@ class ResourceImage(node.Node):
         self._parent = parent
 
         if not self.image and self.filepath:
-            self.image = ImageTk.PhotoImage(Image.open(self.filepath))
+            self.image = self.acquire(self.variant)
+
+        self._id = game.display.acquire_item(parent, self.filepath, self._x, self._y, self.image)
+        self.visible = True
 
-        self._id = parent.create_image(self._x, self._y, image=self.image, anchor=Tkinter.CENTER)
+        self.cull(self._x, self._y)
+        self.snap()
 
     @node.Node.x.setter
     def x(self, x):
         if self._x is x:
             return
 
+        if self._parent:
+            self.track()
+
         self._x = x
+        self.invalidate()
 
         if self._parent:
             self.move()
@@ -60,31 +306,117 @@ class ResourceImage(node.Node):
         if self._y is y:
             return
 
+        if self._parent:
+            self.track()
+
         self._y = y
+        self.invalidate()
 
         if self._parent:
             self.move()
 
     @node.Node.position.setter
     def position(self, position):
+        if self._parent:
+            self.track()
+
         self._x, self._y = position
+        self.invalidate()
 
         if self._parent:
             self.move()
 
+    @node.Node.rotation.setter
+    def rotation(self, rotation):
+        self._rotation = rotation % 360
+        self.retexture()
+
     @property
-    def width(self):
-        if self._width != self.image.width():
-            self._width = self.image.width()
+    def scale(self):
+        return self._scale
 
-        return self._width
+    @scale.setter
+    def scale(self, scale):
+        self._scale = scale
+        self.retexture()
+
+    @property
+    def width(self):
+        # a rotated texture is larger, the size stays the one the image was
+        # loaded with so collisions do not change while it tumbles.
+        return int(self._width * self._scale)
 
     @property
     def height(self):
-        if self._height != self.image.height():
-            self._height = self.image.height()
+        return int(self._height * self._scale)
 
-        return self._height
+    @classmethod
+    def variant_of(cls, rotation, scale):
+        step = int(round(rotation * cls.ROTATION_STEPS / 360.0)) % cls.ROTATION_STEPS
+
+        if not step and scale == 1:
+            return None
+
+        return (step, scale)
+
+    @classmethod
+    def transform(cls, variant):
+        step, scale = variant
+
+        def transform(image):
+            image = image.convert('RGBA')
+
+            if scale != 1:
+                image = image.resize((max(int(image.size[0] * scale), 1), max(int(image.size[1] * scale), 1)),
+                    Image.BILINEAR)
+
+            if step:
+                image = image.rotate(step * 360.0 / cls.ROTATION_STEPS, Image.BICUBIC, expand=True)
+
+            return image
+
+        return transform
+
+    @classmethod
+    def precompute(cls, filepath, scales=(1,), deadline=None):
+        """
+        Makes every rotation step of an image up front so setting the
+        rotation only ever swaps to a cached texture, returns False when
+        the deadline ran out before all of them were made
+        """
+
+        for scale in scales:
+            for step in xrange(cls.ROTATION_STEPS):
+                if deadline and deadline.time_remaining <= 0:
+                    return False
+
+                variant = cls.variant_of(step * 360.0 / cls.ROTATION_STEPS, scale)
+
+                if variant:
+                    game.textures.warm(filepath, variant, cls.transform(variant))
+
+        return True
+
+    def acquire(self, variant):
+        return game.textures.acquire(self.filepath, variant, self.transform(variant) if variant else None)
+
+    def retexture(self):
+        variant = self.variant_of(self._rotation, self._scale)
+
+        if variant == self.variant:
+            return
+
+        # the image is not loaded while it is unrendered, it picks the
+        # variant up when it is rendered again.
+        if self.image:
+            image = self.acquire(variant)
+            game.textures.release(self.filepath, self.variant)
+            self.image = image
+
+            if self._parent:
+                self._parent.itemconfigure(self._id, image=image)
+
+        self.variant = variant
 
     def collide_point(self, target):
         min_x, min_y = self.x - self.width / 2, self.y - self.height / 2
@@ -95,8 +427,35 @@ class ResourceImage(node.Node):
 
         return min_x <= max_tx and min_x >= min_tx and min_y <= max_ty and min_y >= min_ty
 
+    def track(self):
+        # remember where the image was before its first move in this tick.
+        if self.tick != game.interpolator.ticks:
+            self.previous_x, self.previous_y = self._x, self._y
+            self.tick = game.interpolator.ticks
+
+    def snap(self):
+        # jumps straight to the current position, e.g. when wrapping around.
+        self.previous_x, self.previous_y = self._x, self._y
+        self.tick = game.interpolator.ticks
+
     def move(self):
-        self._parent.coords(self._id, (self._x, self._y))
+        # the interpolator draws the image once the frame is rendered.
+        game.interpolator.track(self)
+
+    def cull(self, x, y):
+        # only crossing the edge of the window changes the state of the item.
+        visible = game.display.visible(x, y, self.image.width(), self.image.height())
+
+        if visible is not self.visible:
+            self.visible = visible
+            self._parent.itemconfigure(self._id, state=backend.NORMAL if visible else backend.HIDDEN)
+
+        return visible
+
+    def draw(self, x, y):
+        # a hidden item is not moved until it comes back into the window.
+        if self.cull(x, y):
+            self._parent.coords(self._id, (x, y))
 
     def render(self, parent):
         if not parent:
@@ -108,19 +467,43 @@ class ResourceImage(node.Node):
         if not self._parent:
             raise ResourceImageError('Cannot detach image from invalid parent')
 
-        del self.image
-        self.image = None
+        # the item is hidden and handed back to the pool, spawning the next
+        # image of the same kind shows it again instead of creating one.
+        game.display.release_item(self._parent, self.filepath, self._id)
+
+        self.release()
+        self._id = None
         self._parent = None
+        self.visible = False
+
+    def release(self):
+        if not self.image:
+            return
+
+        game.textures.release(self.filepath, self.variant)
+        self.image = None
+
+    @staticmethod
+    def reserve(filepath, count):
+        """
+        Creates hidden items up front so the first images of this kind
+        spawned do not create any either
+        """
+
+        image = game.textures.acquire(filepath)
+        game.display.reserve_items(filepath, image, count)
+        game.textures.release(filepath)
 
     def destroy(self):
+        if self._parent:
+            self.unrender()
+
         super(ResourceImage, self).destroy()
 
+        self.release()
         self.root = None
         self.filepath = None
 
-        del self.image
-        self.image = None
-
 class ResourceScrolledImage(node.Node):
     """
     An image that scrolls across the screen endlessly
@@ -147,9 +530,11 @@ class ResourceScrolledImage(node.Node):
     def update(self):
         if self.image_0.y - self.image_0.height / 2 >= self._parent.display.height:
             self.image_0.y = self.image_1.y - self.image_0.height
+            self.image_0.snap()
 
         if self.image_1.y - self.image_1.height / 2 >= self._parent.display.height:
             self.image_1.y = self.image_0.y - self.image_1.height
+            self.image_1.snap()
 
         self.image_0.y += self.speed
         self.image_1.y += self.speed
@@ -169,75 +554,109 @@ class ResourceFrameImage(node.Node):
     A class for creating GIF like images with multiple playback frames
     """
 
-    def __init__(self, root, frames, callback=None):
+    def __init__(self, root, frames, callback=None, frame_time=None):
         super(ResourceFrameImage, self).__init__()
 
         if not isinstance(frames, list):
             raise ResourceImageError('Frame image objects only support list arrays!')
 
+        for filepath in frames:
+            if not game.preloader.exists(filepath):
+                raise ResourceImageError('Failed to load image %s!' % filepath)
+
         self.root = root
         self.frames = frames
         self.callback = callback
-        self.images = {}
-        self.can_play = False
+        # the animation plays at the simulation's tick rate by default.
+        self.frame_time = frame_time or game.tick_time
+        self.start_time = None
+        self._can_play = False
 
-        for index in xrange(len(self.frames)):
-            self.images[index] = ResourceImage(self.root, self.frames[index])
+        # every frame is decoded up front, playing only swaps the image shown
+        # by a single canvas item.
+        self.images = [game.textures.acquire(filepath) for filepath in self.frames]
+        self.current_index = None
 
-        self.current_index = 0
-        self.current_image = None
+    @property
+    def can_play(self):
+        return self._can_play
+
+    @can_play.setter
+    def can_play(self, can_play):
+        # the animation starts over from its next update every time it is played.
+        if can_play:
+            self.start_time = None
+            self.current_index = None
+
+        self._can_play = can_play
 
     @node.Node.x.setter
     def x(self, x):
-        for image in self.images.values():
-            image.x = x
+        self.position = (x, self._y)
 
     @node.Node.y.setter
     def y(self, y):
-        for image in self.images.values():
-            image.y = y
+        self.position = (self._x, y)
 
     @node.Node.position.setter
     def position(self, position):
-        for image in self.images.values():
-            image.position = position
+        self._x, self._y = position
+
+        if self._id:
+            self.root.coords(self._id, self._x, self._y)
 
     @property
     def current_frame(self):
-        return self.images[self.current_index]
+        return self.images[self.current_index or 0]
 
     def update(self):
-        if not self.can_play:
-            # clear all frames incase one is still rendered.
+        if not self._can_play:
             return self.clear()
 
-        if self.current_index >= len(self.images):
-            self.current_index = 0
+        if self.start_time is None:
+            self.start_time = game.clock.time()
+
+        # frames follow the elapsed clock time, not the number of updates.
+        index = int((game.clock.time() - self.start_time) / self.frame_time)
+
+        if index >= len(self.images):
+            self.clear()
 
             if callable(self.callback):
                 return self.callback()
 
-        if self.current_image and self.current_image.parent:
-            self.current_image.unrender()
+            return
+
+        if index == self.current_index:
+            return
 
-        self.current_image = self.images[self.current_index]
-        self.current_image.render(self.root)
+        self.current_index = index
 
-        self.current_index += 1
+        if not self._id:
+            self._id = game.display.acquire_item(self.root, self.frames[0], self._x, self._y, self.images[index])
+        else:
+            self.root.itemconfigure(self._id, image=self.images[index], state=backend.NORMAL)
 
     def clear(self):
-        for image in self.images.values():
-            if image and image.parent:
-                image.unrender()
+        if self.current_index is None:
+            return
+
+        self.current_index = None
+        self.root.itemconfigure(self._id, state=backend.HIDDEN)
 
     def destroy(self):
+        if self._id:
+            game.display.release_item(self.root, self.frames[0], self._id)
+
+        for filepath in self.frames:
+            game.textures.release(filepath)
+
         self.root = None
         self.frames = []
-        self.images = {}
+        self.images = []
         self.callback = None
-        self.can_explode = False
-        self.current_index = 0
-        self.current_image = None
+        self._can_play = False
+        self.current_index = None
 
         super(ResourceFrameImage, self).destroy()
 
@@ -257,12 +676,12 @@ class ResourceLabel(node.Node):
     def __init__(self, font_size, font_family='Pixeled', bind_events=True):
         super(ResourceLabel, self).__init__()
 
-        util.load_font('assets/font/Pixeled.ttf')
+        game.display.backend.load_font('assets/font/Pixeled.ttf')
 
         self.font_size = font_size
         self.font_family = font_family
         self.bind_events = bind_events
-        self._font = tkFont.Font(family=self.font_family, size=self.font_size)
+        self._font = game.display.backend.create_font(family=self.font_family, size=self.font_size)
         self._text = None
         self._width = font_size
         self._height = font_size / 2
@@ -285,7 +704,7 @@ class ResourceLabel(node.Node):
             return
 
         self._parent = parent
-        self.label = Tkinter.Label(parent, text=self._text, font=self._font,
+        self.label = game.display.acquire_label(parent, text=self._text, font=self._font,
             background='black', foreground=self._color)
 
         # move the label object into position; the position can be set before
@@ -392,7 +811,7 @@ class ResourceLabel(node.Node):
             self.unbind('Enter')
             self.unbind('Leave')
             self.unbind('Button-1')
-        except (_tkinter.TclError):
+        except game.display.backend.errors:
             return
 
     def enter(self, event):
@@ -426,7 +845,7 @@ class ResourceLabel(node.Node):
         pass
 
     def move(self):
-        self._label.place(x=self._x, y=self._y, anchor=Tkinter.CENTER)
+        self._label.place(x=self._x, y=self._y, anchor=backend.CENTER)
 
     def render(self, parent):
         if not parent:
@@ -438,9 +857,13 @@ class ResourceLabel(node.Node):
         if not self._parent:
             raise ResourceLabelError('Cannot detach image from invalid parent!')
 
-        self._label.forget()
-        self._label.destroy()
+        if self.bind_events:
+            self.unbindall()
 
+        # the widget goes back to the display's pool, the next render takes
+        # one out again.
+        game.display.release_label(self._label)
+        self._label = None
         self._parent = None
 
     def destroy(self):
@@ -453,7 +876,6 @@ class ResourceLabel(node.Node):
         self._font = None
 
         if self._label:
-            self.unbindall()
             self.unrender()
 
         self.font_size = 0
@@ -516,16 +938,18 @@ class ResourceTimer(object):
     An object that manages the amount time since it was constructed
     """
 
-    __slots__ = ('start_time')
+    __slots__ = ('clock', 'start_time')
 
-    def __init__(self):
-        self.start_time = time.time()
+    def __init__(self, clock=None):
+        self.clock = clock or game.clock
+        self.start_time = self.clock.time()
 
     @property
     def current_time(self):
-        return time.time() - self.start_time
+        return self.clock.time() - self.start_time
 
     def destroy(self):
+        self.clock = None
         self.start_time = 0
 
 class ResourceTimerLabel(ResourceLabel):
@@ -561,14 +985,74 @@ class ResourceTimerLabel(ResourceLabel):
         self.timer.destroy()
         self.timer = None
 
-        super(ResourceTimerLabel, self).setup()
+        super(ResourceTimerLabel, self).destroy()
+
+class ResourcePerformanceLabel(ResourceLabel):
+    """
+    A label that shows the frame timings and the entity counts of a scene
+    """
+
+    __slots__ = ('master', 'refresh_time')
+
+    REFRESH_RATE = 0.25
+
+    def __init__(self, master, x, y):
+        super(ResourcePerformanceLabel, self).__init__(8, bind_events=False)
+
+        self.master = master
+        self.refresh_time = 0
+        self.position = (x, y)
+        self.color = 'green'
+
+    def toggle(self):
+        if self._parent:
+            self.unrender()
+        else:
+            self.render(self.master.canvas)
+            self.refresh_time = 0
+            self.refresh()
+
+    def refresh(self):
+        # rebuilding the text every frame would cost more than it measures.
+        now = time.time()
+
+        if not self._parent or now - self.refresh_time < self.REFRESH_RATE:
+            return
+
+        self.refresh_time = now
+        timings = game.frame_timings
+
+        lines = [
+            'FPS: %d' % timings.fps,
+            'Frame p50/95/99: %.1f/%.1f/%.1f ms' % tuple(timings.percentile('frame', percent) * 1000 for \
+                percent in (50, 95, 99)),
+            'Tasks: %.1f ms' % (timings.average('tasks') * 1000),
+            'Scene: %.1f ms' % (timings.average('scene') * 1000),
+            'Display: %.1f ms' % (timings.average('display') * 1000),
+            'Textures: %d (%d hits, %d misses)' % (len(game.textures), game.textures.hits, game.textures.misses),
+        ]
+
+        if game.tcl_profiler:
+            lines.append('Tcl: %.1f calls, %.2f ms' % (game.tcl_profiler.calls, game.tcl_profiler.elapsed * 1000))
+            lines.extend('  %s: %.1f' % (name, calls) for name, calls, elapsed in \
+                game.tcl_profiler.statistics('module')[:3])
+
+        lines.extend('%s: %d' % (name, count) for name, count in self.master.statistics())
+        self.text = '\n'.join(lines)
+
+    def destroy(self):
+        self.master = None
+
+        super(ResourcePerformanceLabel, self).destroy()
 
 class ResourceScoreBoard(object):
     """
     A class that manages and tracks scores, high scores
     """
 
-    def __init__(self):
+    def __init__(self, task_manager):
+        self.task_manager = task_manager
+        self.pending = False
         self.filename = 'userdata.json'
         self.data = {
             'score': 0,
@@ -576,7 +1060,7 @@ class ResourceScoreBoard(object):
         }
 
         if not os.path.exists(self.filename):
-            self.write()
+            self.save(self.data)
 
         self.read()
 
@@ -610,14 +1094,33 @@ class ResourceScoreBoard(object):
             self.data = json.loads(zlib.decompress(file.read())); file.close()
 
     def write(self):
+        # setting a score writes twice, both are folded into one idle flush.
+        if self.pending:
+            return
+
+        self.pending = True
+        self.task_manager.add_idle(self.flush)
+
+    def flush(self, deadline):
+        # compressing and writing to disk blocks, hand a copy of the scores
+        # to the task executor so the frame never waits on it.
+        self.pending = False
+        self.task_manager.submit(self.save, dict(self.data))
+
+    def save(self, data):
         with open(self.filename, 'wb') as file:
-            data = zlib.compress(json.dumps(self.data))
+            data = zlib.compress(json.dumps(data))
 
             if not data:
                 file.close(); return
 
             file.write(data); file.close()
 
+    def destroy(self):
+        # the idle flush never got to run, write the scores before shutting down.
+        if self.pending:
+            self.flush(None)
+
 class ResourceStopWatchError(RuntimeError):
     """
     A stop watch specific runtime error
@@ -628,10 +1131,11 @@ class ResourceStopWatch(object):
     A timer that counts backwards and callsback
     """
 
-    def __init__(self, countdown_to, start_callback, stop_callback):
+    def __init__(self, countdown_to, start_callback, stop_callback, task_group=None):
         self.current_time = countdown_to
         self.start_callback = start_callback
         self.stop_callback = stop_callback
+        self.task_group = task_group
         self.delay = 0.1
 
     def setup(self):
@@ -639,19 +1143,20 @@ class ResourceStopWatch(object):
             raise ResourceStopWatchError('Failed to call start callback!')
 
         self.start_callback()
-        self.update_task = game.task_manager.add_delayed(self.delay,
+        self.update_task = (self.task_group or game.task_manager).add_delayed(self.delay,
             self.update)
 
     def update(self, task):
-        if self.current_time <= 0:
-            if not callable(self.stop_callback):
-                raise ResourceStopWatchError('Failed to call stop callback!')
+        while self.current_time > 0:
+            self.current_time -= self.delay
+            self.explicit_update()
+
+            yield self.delay
 
-            self.stop_callback(); return task.done
+        if not callable(self.stop_callback):
+            raise ResourceStopWatchError('Failed to call stop callback!')
 
-        self.current_time -= self.delay
-        self.explicit_update()
-        return task.wait
+        self.stop_callback()
 
     def explicit_update(self):
         pass
@@ -665,7 +1170,8 @@ class ResourceStopWatchLabel(ResourceStopWatch):
     """
 
     def __init__(self, master, x, y, countdown_to, start_callback, stop_callback):
-        super(ResourceStopWatchLabel, self).__init__(countdown_to, start_callback, stop_callback)
+        super(ResourceStopWatchLabel, self).__init__(countdown_to, start_callback, stop_callback,
+            master.task_group)
 
         self.label = ResourceLabel(40, bind_events=False)
         self.label.position = (x, y)
@@ -673,6 +1179,13 @@ class ResourceStopWatchLabel(ResourceStopWatch):
         self.label.render(master.canvas)
 
     def explicit_update(self):
+        game.task_manager.post(self.refresh)
+
+    def refresh(self):
+        # the stop watch may have been destroyed before the main thread got here.
+        if not self.label:
+            return
+
         self.label.text = '%d' % self.current_time
 
     def destroy(self):
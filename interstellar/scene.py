@@ -1,7 +1,11 @@
 import time
-import Tkinter
-from PIL import ImageGrab
-from interstellar import audio, util, resource, sprite, mechanism
+from interstellar import audio, util, resource, sprite, mechanism, task
+
+try:
+    from PIL import ImageGrab
+except ImportError:
+    # screenshots are only supported on windows and macOS.
+    ImageGrab = None
 
 class SceneError(RuntimeError):
     """
@@ -13,17 +17,27 @@ class Scene(object):
     An object that manages and creates objects in a game
     """
 
+    # the images the scene loads while it is being built.
+    ASSETS = ()
+
     def __init__(self, root, master, can_pause=False):
         self.root = root
         self.master = master
         self.can_pause = can_pause
         self.active = False
+        self.task_group = self.root.task_manager.create_group()
+        self.bindings = set()
 
-        self.canvas = Tkinter.Canvas(self.master.root, width=self.master.width, height=self.master.height, background='black',
-            highlightthickness=0)
-
+        # the canvas outlives the scene, the scene only owns what it draws.
+        self.canvas = self.master.canvas
         self.canvas.focus_set()
-        self.canvas.pack(fill=Tkinter.BOTH, expand=True, anchor=Tkinter.CENTER)
+
+        self.overlay = resource.ResourcePerformanceLabel(self, self.master.width / 1.25,
+            self.master.height / 1.2)
+
+    @classmethod
+    def manifest(cls):
+        return cls.ASSETS
 
     def setup(self):
         if self.active:
@@ -31,10 +45,15 @@ class Scene(object):
 
         self.bind('Configure', self.reconfigure)
         self.bind('F1', self.take_screenshot)
+        self.bind('F3', self.toggle_overlay)
 
         if self.can_pause:
             self.bind('KeyRelease-Return', self.toggle_pause)
 
+        # the overlay stays up across scene switches until it is toggled off.
+        if self.root.show_overlay:
+            self.overlay.toggle()
+
         self.active = True
 
     def update(self):
@@ -50,12 +69,14 @@ class Scene(object):
         if not self.canvas:
             return None
 
+        self.bindings.add(event)
         return self.canvas.bind('<%s>' % event, *args, **kwargs)
 
     def unbind(self, event, *args, **kwargs):
         if not self.canvas:
             return None
 
+        self.bindings.discard(event)
         return self.canvas.unbind('<%s>' % event, *args, **kwargs)
 
     def send(self, event, *args, **kwargs):
@@ -65,13 +86,26 @@ class Scene(object):
         return self.canvas.event_generate('<%s>' % event, *args, **kwargs)
 
     def toggle_pause(self, event):
+        # the clock drives every timer, pausing it holds power ups and labels.
         if self.active:
             self.active = False
+            self.root.clock.pause()
             self.pause()
         else:
             self.active = True
+            self.root.clock.resume()
             self.unpause()
 
+    def toggle_overlay(self, event):
+        self.root.show_overlay = not self.root.show_overlay
+        self.overlay.toggle()
+
+    def statistics(self):
+        return [
+            ('Pending tasks', len(self.root.task_manager.tasks)),
+            ('Canvas items', len(self.canvas.find_all())),
+        ]
+
     def pause(self):
         pass
 
@@ -79,6 +113,9 @@ class Scene(object):
         pass
 
     def take_screenshot(self, event):
+        if not ImageGrab:
+            return None
+
         x1, y1 = self.master.x + 3, self.master.y + 26
         x2, y2 = x1 + self.master.width, y1 + self.master.height
         return ImageGrab.grab().crop((x1, y1, x2, y2)).save('screenshot-%d.jpg' % \
@@ -89,13 +126,17 @@ class Scene(object):
             raise SceneError('Scene has not been setup!')
 
         self.active = False
-        self.unbind('Configure')
-        self.unbind('F1')
+        self.task_group.cancel()
 
-        if self.can_pause:
-            self.unbind('KeyRelease-Return')
+        # the sprites bind through the scene too, nothing is left bound on
+        # the shared canvas for the next scene.
+        for event in list(self.bindings):
+            self.unbind(event)
+
+        self.overlay.destroy()
+        self.overlay = None
 
-        self.canvas.destroy()
+        self.master.clear()
         self.canvas = None
 
 class MainMenu(Scene):
@@ -159,6 +200,7 @@ class MainMenu(Scene):
         self.music_array.deselect()
         self.music_array.destroy()
 
+        self.logo.destroy()
         self.play_button.destroy()
         self.quit_button.destroy()
         self.options_button.destroy()
@@ -231,9 +273,16 @@ class GameLevelCountdown(Scene):
 
         self.countdown_done = False
 
+    @classmethod
+    def manifest(cls):
+        # keep the level's images when replaying from the death menu.
+        return GameLevel.manifest()
+
     def setup(self):
         super(GameLevelCountdown, self).setup()
 
+        # the level is decoded in the background during the countdown.
+        self.root.preloader.preload(GameLevel.manifest())
         self.start_countdown.setup()
 
     def countdown_callback(self):
@@ -255,6 +304,20 @@ class GameLevelCountdown(Scene):
         super(GameLevelCountdown, self).destroy()
 
 class GameLevel(Scene):
+    ASSETS = tuple(['assets/explosion/%d.png' % index for index in xrange(15)] + [
+        'assets/stars.png',
+        'assets/player.png',
+        'assets/bullet.png',
+        'assets/shield.png',
+        'assets/asteroids/asteroid-small.png',
+        'assets/asteroids/asteroid-big.png',
+        'assets/icons/shield_icon.png',
+        'assets/icons/instant_kill_icon.png',
+        'assets/icons/full_health_icon.png',
+        'assets/icons/double_health_icon.png',
+    ])
+
+    ASTEROIDS = ('assets/asteroids/asteroid-small.png', 'assets/asteroids/asteroid-big.png')
 
     def __init__(self, root, master):
         super(GameLevel, self).__init__(root, master, can_pause=True)
@@ -320,6 +383,17 @@ class GameLevel(Scene):
         self.ship.setup()
         self.time_label.setup()
 
+        # bullets and asteroids come and go all the time, their canvas items
+        # are made now and only shown and hidden while playing.
+        resource.ResourceImage.reserve('assets/bullet.png', self.ship.controller.maximum_projectiles + 1)
+
+        for filepath in self.ASTEROIDS:
+            resource.ResourceImage.reserve(filepath, self.maximum_asteroids)
+
+        # the tumbling asteroids' rotations are made in the spare frame time.
+        if sprite.AsteroidController.TUMBLE:
+            self.root.task_manager.add_idle(self.precompute)
+
     def update(self):
         super(GameLevel, self).update()
 
@@ -329,7 +403,8 @@ class GameLevel(Scene):
         self.distance_label.text = self.distance
         self.health_label.text = self.health
 
-        for asteroid in self.asteroids:
+        # asteroids which fall off the screen remove themselves.
+        for asteroid in list(self.asteroids):
             asteroid.update()
 
         if len(self.asteroids) < self.maximum_asteroids:
@@ -341,6 +416,23 @@ class GameLevel(Scene):
     def explicit_update(self):
         self.ship.explicit_update()
 
+    def precompute(self, deadline):
+        # a paused level keeps going, only a destroyed one has no canvas.
+        if not self.canvas:
+            return task.TaskResult.DONE
+
+        for filepath in self.ASTEROIDS:
+            if not resource.ResourceImage.precompute(filepath, deadline=deadline):
+                return task.TaskResult.CONT
+
+        return task.TaskResult.DONE
+
+    def statistics(self):
+        return [
+            ('Asteroids', len(self.asteroids)),
+            ('Projectiles', len(self.ship.controller.projectiles)),
+        ] + super(GameLevel, self).statistics()
+
     def add_asteroid(self):
         asteroid = util.weighted_choice(self.asteroid_choices)(self, sprite.\
             AsteroidController)
@@ -433,6 +525,11 @@ class DeathMenu(Scene):
         self.main_menu_button.text = 'Return To Menu'
         self.main_menu_button.render(self.canvas)
 
+    @classmethod
+    def manifest(cls):
+        # retry is one click away, keep the level's textures around.
+        return GameLevel.manifest()
+
     def setup(self):
         super(DeathMenu, self).setup()
 
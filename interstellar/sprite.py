@@ -110,8 +110,7 @@ class SpriteController(node.Node):
         pass
 
     def move(self):
-        if self.sprite._attachment and hasattr(self.sprite._attachment, 'image') and self.sprite._attachment.image and self.image:
-            self.sprite._attachment.image.position = (self.image.x, self.image.y)
+        pass
 
     def bind(self, *args, **kwargs):
         if not self._parent or not self.bind_events:
@@ -239,7 +238,7 @@ class ShipController(SpriteController):
         self.check_player_collisions()
 
     def update_projectiles(self):
-        for projectile in self.projectiles:
+        for projectile in list(self.projectiles):
 
             if projectile.y <= 0:
                 self.destroy_projectile(projectile)
@@ -291,7 +290,8 @@ class ShipController(SpriteController):
         self.projectiles.remove(projectile)
 
     def destroy_projectiles(self):
-        for projectile in self.projectiles:
+        # every image has to be destroyed to hand its texture back.
+        for projectile in list(self.projectiles):
             self.destroy_projectile(projectile)
 
     def destroy(self):
@@ -331,11 +331,15 @@ class Ship(Sprite):
 
 class AsteroidController(SpriteController):
 
+    # rocks tumbling as they fall, off unless turned on.
+    TUMBLE = False
+
     def __init__(self, sprite):
         super(AsteroidController, self).__init__(sprite)
 
         self.speed = 25
         self.speed = random.random() * self.speed
+        self.spin = random.uniform(-8, 8) if self.TUMBLE else 0
 
     def move(self):
         if self.image.y >= self._parent.root.display.height:
@@ -344,6 +348,10 @@ class AsteroidController(SpriteController):
 
         self.image.y += self.speed
 
+        # power ups keep their icon upright.
+        if self.spin and not self.sprite.is_mechanism:
+            self.image.rotation += self.spin
+
 class Asteroid(Sprite):
     PROBABILITY = 100
 
@@ -383,7 +391,7 @@ class MechanismAsteroid(Asteroid):
         self.damage = 0
 
     def die(self, killer):
-        killer.attachment = self.ATTACHMENT(killer)
+        killer.attachment = self.ATTACHMENT(killer, self._parent)
         self._parent.remove_asteroid(self, False)
 
 class ShieldMechanismAsteroid(MechanismAsteroid):
@@ -1,5 +1,14 @@
+import sys
+import math
 import time
+import heapq
+import collections
+import operator
 import threading
+import types
+import traceback
+import Queue
+from interstellar.clock import Clock
 
 class TaskResult(object):
     DONE = 0
@@ -12,17 +21,19 @@ class TaskError(RuntimeError):
     """
 
 class Task(object):
+    """
+    A scheduled callback, task objects are recycled once they are removed
+    so callers are handed a TaskHandle instead of the task itself.
 
-    def __init__(self, id):
-        self.id = id
-        self.name = 'Task-%d' % id
-        self.function = None
-        self.timestamp = time.time()
-        self.delay = 0.0
-        self.can_delay = True
-        self.args = []
-        self.kwargs = {}
-        self.active = False
+    The function may also be a generator, it is resumed each time it is due
+    and yields the number of seconds to wait or `next_frame`.
+    """
+
+    __slots__ = ('id', 'name', 'clock', 'function', 'generator', 'group', 'timestamp', 'deadline',
+        'delay', 'priority', 'sequence', 'args', 'kwargs', 'active', 'queued')
+
+    def __init__(self, id, clock):
+        self.reset(id, clock)
 
     @property
     def done(self):
@@ -36,21 +47,59 @@ class Task(object):
     def wait(self):
         return TaskResult.WAIT
 
+    @property
+    def next_frame(self):
+        # a bare yield also resumes the generator on the next frame.
+        return None
+
     @property
     def duration(self):
-        return time.time() - self.timestamp
+        return self.clock.time() - self.timestamp
+
+    def reset(self, id, clock):
+        self.id = id
+        self.name = 'Task-%d' % id
+        self.clock = clock
+        self.function = None
+        self.generator = None
+        self.group = None
+        self.timestamp = clock.time()
+        self.deadline = self.timestamp
+        self.delay = 0.0
+        self.priority = 0
+        self.sequence = None
+        self.args = []
+        self.kwargs = {}
+        self.active = False
+        self.queued = False
 
     def execute(self):
         if not callable(self.function):
             raise TaskError('Failed to execute task %s, function not callable!' % self.name)
 
-        if self.can_delay:
-            if self.duration < self.delay:
-                return self.wait
-            else:
-                self.timestamp = time.time()
+        self.timestamp = self.clock.time()
+
+        if self.generator is None:
+            result = self.function(self, *self.args, **self.kwargs)
 
-        return self.function(self, *self.args, **self.kwargs)
+            if not isinstance(result, types.GeneratorType):
+                return result
+
+            self.generator = result
+
+        return self.resume()
+
+    def resume(self):
+        try:
+            delay = next(self.generator)
+        except StopIteration:
+            return TaskResult.DONE
+
+        if delay is None:
+            return TaskResult.CONT
+
+        self.delay = delay
+        return TaskResult.WAIT
 
     def run(self):
         if not self.active:
@@ -59,61 +108,535 @@ class Task(object):
         return self.execute()
 
     def destroy(self):
-        self.id = self.name = self.function = self.timestamp = self.args = self.kwargs = None
+        if self.generator is not None:
+            try:
+                self.generator.close()
+            except ValueError:
+                # the generator removed its own task while it was running.
+                pass
+
+        self.id = self.name = self.clock = self.function = self.generator = self.group = self.timestamp = self.deadline = \
+            self.sequence = self.args = self.kwargs = None
+
+        self.active = False
+        self.queued = False
+
+class TaskHandle(object):
+    """
+    Returned when a task is added, it keeps the id the task had back then
+    so a handle to a finished task never reaches the task it was recycled into
+    """
+
+    __slots__ = ('task', 'id')
+
+    def __init__(self, task):
+        self.task = task
+        self.id = task.id
+
+    @property
+    def name(self):
+        return 'Task-%d' % self.id
+
+    @property
+    def active(self):
+        return self.task.id == self.id and self.task.active
+
+class TaskLatency(object):
+    """
+    Tracks how late tasks ran compared to their deadline
+    """
+
+    __slots__ = ('count', 'total', 'maximum')
+
+    def __init__(self):
+        self.reset()
+
+    @property
+    def average(self):
+        if not self.count:
+            return 0.0
+
+        return self.total / self.count
+
+    def record(self, lateness):
+        self.count += 1
+        self.total += lateness
+
+        if lateness > self.maximum:
+            self.maximum = lateness
+
+    def reset(self):
+        self.count = 0
+        self.total = 0.0
+        self.maximum = 0.0
+
+class TaskExecutorError(RuntimeError):
+    """
+    A task executor specific runtime error
+    """
+
+class TaskExecutor(object):
+    """
+    Runs blocking jobs such as disk writes on a background thread, jobs run
+    one at a time in the order they were submitted and their callbacks are
+    posted back to the main thread. A job which fails is reported to the
+    error handler, the frame loop never sees the exception.
+    """
+
+    def __init__(self, task_manager, error_handler=None):
+        self.task_manager = task_manager
+        self.error_handler = error_handler
+        self.jobs = Queue.Queue()
+        self.thread = None
+
+    def submit(self, function, *args, **kwargs):
+        callback = kwargs.pop('callback', None)
+
+        if not self.thread:
+            self.thread = threading.Thread(target=self.mainloop)
+            self.thread.daemon = True
+            self.thread.start()
+
+        self.jobs.put((function, args, kwargs, callback))
+
+    def fail(self, function, error, trace):
+        error = TaskExecutorError('Failed to execute job %r, %s!' % (function, error))
+
+        if callable(self.error_handler):
+            return self.error_handler(error, trace)
+
+        sys.stderr.write('%s\n%s' % (error, trace))
+
+    def mainloop(self):
+        while True:
+            job = self.jobs.get()
+
+            if job is None:
+                break
+
+            function, args, kwargs, callback = job
+
+            try:
+                result = function(*args, **kwargs)
+            except Exception as error:
+                self.task_manager.post(self.fail, function, error, traceback.format_exc())
+                continue
+
+            if callable(callback):
+                self.task_manager.post(callback, result)
+
+    def destroy(self):
+        # let any pending jobs such as score writes finish before shutdown.
+        if self.thread:
+            self.jobs.put(None)
+            self.thread.join()
+
+        self.thread = None
+
+class TaskProfileRecord(object):
+    """
+    The execution statistics of every task sharing the same function
+    """
+
+    __slots__ = ('label', 'calls', 'total', 'maximum', 'lateness', 'maximum_lateness')
+
+    def __init__(self, label):
+        self.label = label
+        self.calls = 0
+        self.total = 0.0
+        self.maximum = 0.0
+        self.lateness = 0.0
+        self.maximum_lateness = 0.0
+
+    @property
+    def average(self):
+        if not self.calls:
+            return 0.0
+
+        return self.total / self.calls
+
+    def record(self, elapsed, lateness):
+        self.calls += 1
+        self.total += elapsed
+        self.lateness += lateness
+
+        if elapsed > self.maximum:
+            self.maximum = elapsed
+
+        if lateness > self.maximum_lateness:
+            self.maximum_lateness = lateness
+
+class TaskProfiler(object):
+    """
+    Records how long each task function takes to run and how late it ran,
+    tasks which take longer than the threshold are passed to the slow handler
+    """
+
+    def __init__(self, threshold=0.005, slow_handler=None):
+        self.threshold = threshold
+        self.slow_handler = slow_handler
+        self.records = {}
+
+    def label(self, task):
+        function = task.function
+        instance = getattr(function, '__self__', None)
+
+        if instance is not None:
+            return '%s.%s' % (instance.__class__.__name__, function.__name__)
+
+        return '%s.%s' % (getattr(function, '__module__', None), getattr(function, '__name__', function))
+
+    def record(self, label, elapsed, lateness):
+        record = self.records.get(label)
+
+        if not record:
+            record = self.records[label] = TaskProfileRecord(label)
+
+        record.record(elapsed, lateness)
+
+        if elapsed >= self.threshold:
+            self.slow(record, elapsed)
+
+    def slow(self, record, elapsed):
+        if callable(self.slow_handler):
+            return self.slow_handler(record, elapsed)
+
+        sys.stderr.write('Task %s took %.2f ms, over the %.2f ms threshold!\n' % (record.label,
+            elapsed * 1000, self.threshold * 1000))
+
+    def report(self):
+        lines = ['%-48s %8s %10s %10s %10s %10s' % ('task', 'calls', 'total ms', 'max ms',
+            'late ms', 'max late')]
+
+        for record in sorted(self.records.values(), key=lambda record: record.total, reverse=True):
+            lines.append('%-48s %8d %10.2f %10.2f %10.2f %10.2f' % (record.label, record.calls,
+                record.total * 1000, record.maximum * 1000, record.lateness / record.calls * 1000,
+                record.maximum_lateness * 1000))
+
+        return '\n'.join(lines)
+
+    def dump(self, stream=None):
+        (stream or sys.stderr).write(self.report() + '\n')
+
+    def destroy(self):
+        self.slow_handler = None
+        self.records = {}
+
+class TaskIdleDeadline(object):
+    """
+    Passed to idle callbacks, long running work should check the time
+    remaining and return `TaskResult.CONT` to continue in the next idle period
+    """
+
+    __slots__ = ('timestamp',)
+
+    def __init__(self, timestamp):
+        self.timestamp = timestamp
+
+    @property
+    def time_remaining(self):
+        return max(self.timestamp - time.time(), 0.0)
 
 class TaskManagerError(RuntimeError):
     """
     A task manager specific runtime error
     """
 
+class TaskGroup(object):
+    """
+    The tasks owned by a single object such as a scene, cancelling the group
+    cancels every task in it at once
+    """
+
+    def __init__(self, task_manager):
+        self.task_manager = task_manager
+        self.active = True
+        self.count = 0
+        self.queued = 0
+
+    def prepend(self, function, delay, *args, **kwargs):
+        kwargs['group'] = self
+        return self.task_manager.prepend(function, delay, *args, **kwargs)
+
+    def add(self, function, *args, **kwargs):
+        return self.prepend(function, 0, *args, **kwargs)
+
+    def add_delayed(self, delay, function, *args, **kwargs):
+        return self.prepend(function, delay, *args, **kwargs)
+
+    def post(self, function, *args, **kwargs):
+        # the group may be cancelled before the main thread gets to it.
+        self.task_manager.post(self.run_posted, function, args, kwargs)
+
+    def run_posted(self, function, args, kwargs):
+        if self.active:
+            function(*args, **kwargs)
+
+    def cancel(self):
+        # the cancelled tasks are dropped as they come due, or all at once
+        # when they make up most of the queue.
+        with self.task_manager.condition:
+            self.active = False
+            self.task_manager.stale += self.queued
+
 class TaskManager(object):
-    TIMEOUT = 0.01
+    """
+    Schedules tasks on a heap ordered by deadline, only the tasks that are due
+    are ever visited. Tasks due in the same pass run in order of their priority,
+    lowest value first.
+    """
 
-    def __init__(self):
-        self.running = {}
-        self.waiting = {}
+    TIMEOUT = 0.01
+    PAUSED_TIMEOUT = 0.1
+    POOL_SIZE = 1024
+    COMPACT_SIZE = 256
+
+    def __init__(self, clock=None):
+        self.clock = clock or Clock()
+        self.tasks = {}
+        self.queue = []
+        self.pool = []
         self.id = 0
+        self.sequence = 0
+        self.stale = 0
+        self.condition = threading.Condition(threading.Lock())
+        self.posted = collections.deque()
+        self.idle = collections.deque()
+        self.latency = TaskLatency()
+        self.executor = TaskExecutor(self)
+        self.profiler = None
+        self.root = None
+        self.ticking = False
+        self.after_id = None
+        self.after_deadline = None
+        self.clock.watch(self.retime)
 
     @property
     def next_id(self):
         self.id += 1; return self.id
 
+    @property
+    def next_sequence(self):
+        self.sequence += 1; return self.sequence
+
+    @property
+    def timeout(self):
+        """
+        The number of seconds until the next task is due, or None when idle
+        """
+
+        if not self.queue:
+            return None
+
+        return max(self.queue[0][0] - self.clock.time(), 0.0)
+
     def has(self, name):
-        return name in self.running or name in self.waiting
+        return name in self.tasks
 
-    def delete(self, task, destroy):
+    def allocate(self):
+        # the caller must hold the condition lock.
+        if self.pool:
+            task = self.pool.pop()
+            task.reset(self.next_id, self.clock)
+        else:
+            task = Task(self.next_id, self.clock)
+
+        return task
+
+    def recycle(self, task):
+        # the caller must hold the condition lock.
+        task.destroy()
+
+        if len(self.pool) < self.POOL_SIZE:
+            self.pool.append(task)
+
+    def schedule(self, task, deadline):
+        # the caller must hold the condition lock.
+        task.deadline = deadline
+        task.sequence = self.next_sequence
+
+        entry = (deadline, task.priority, task.sequence, task)
+        heapq.heappush(self.queue, entry)
+
+        task.queued = True
+
+        if task.group:
+            task.group.queued += 1
+
+        # wake the scheduler only when it is sleeping past the new deadline.
+        if self.queue[0] is entry:
+            self.condition.notify()
+
+            if self.root and not self.ticking:
+                self.wake()
+
+    def dequeue(self, task):
+        # the caller must hold the condition lock, the task's heap entry is
+        # either popped or no longer valid.
+        task.queued = False
+
+        if task.group:
+            task.group.queued -= 1
+
+    def wake(self):
+        # the caller must hold the condition lock.
+        deadline = self.queue[0][0] if self.queue else None
+
+        if deadline == self.after_deadline:
+            return
+
+        if self.after_id:
+            self.root.after_cancel(self.after_id)
+
+        self.after_id = self.after_deadline = None
+
+        if deadline is None:
+            return
+
+        # a stopped clock is checked again until it starts moving.
+        delay = self.clock.real(max(deadline - self.clock.time(), 0.0))
+
+        if delay is None:
+            delay = self.PAUSED_TIMEOUT
+
+        delay = int(math.ceil(delay * 1000))
+        self.after_id = self.root.after(delay, self.tick)
+        self.after_deadline = deadline
+
+    def retime(self):
+        # the clock changed speed, paused or resumed, every wait was worked
+        # out at the old rate.
+        with self.condition:
+            self.condition.notify_all()
+
+            if self.root and not self.ticking:
+                self.after_deadline = None
+                self.wake()
+
+    def tick(self):
+        self.after_id = self.after_deadline = None
+        self.ticking = True
+
+        # a task which raises must not leave the timers without a callback.
         try:
-            del self.waiting[task.name]
-        except KeyError:
-            del self.running[task.name]
+            self.poll()
+        finally:
+            self.ticking = False
+
+            with self.condition:
+                self.wake()
+
+    def delete(self, task, destroy):
+        del self.tasks[task.name]
+
+        if task.group:
+            task.group.count -= 1
+
+        # invalidates the queued heap entry, it is discarded once popped.
+        task.sequence = None
 
         if destroy:
-            task.destroy()
+            self.recycle(task)
 
     def activate(self, task):
-        if self.has(task.name):
-            raise TaskManagerError('Failed to activate task %s, already activated!' % task.name)
+        with self.condition:
+            if self.has(task.name):
+                raise TaskManagerError('Failed to activate task %s, already activated!' % task.name)
 
-        task.active = True
-        self.waiting[task.name] = task
+            if task.group and not task.group.active:
+                raise TaskManagerError('Failed to activate task %s, group has been cancelled!' % task.name)
+
+            task.active = True
+            self.tasks[task.name] = task
+            self.schedule(task, self.clock.time() + task.delay)
 
         return task
 
+    def resolve(self, task):
+        # the caller must hold the condition lock.
+        if not isinstance(task, TaskHandle):
+            return task
+
+        # the task finished and was recycled since the handle was given out.
+        if task.task.id != task.id:
+            return None
+
+        return task.task
+
     def deactivate(self, task, destroy=False):
-        if not self.has(task.name):
-            raise TaskManagerError('Failed to deactivate task %s, never activated!' % task.name)
+        with self.condition:
+            handle, task = task, self.resolve(task)
+
+            if not task:
+                return None
+
+            if not self.has(task.name):
+                raise TaskManagerError('Failed to deactivate task %s, never activated!' % handle.name)
+
+            task.active = False
 
+            # only an entry still on the heap goes stale, a cancelled group
+            # already counted the entries of its tasks.
+            if task.queued:
+                if not task.group or task.group.active:
+                    self.stale += 1
+
+                self.dequeue(task)
+
+            self.delete(task, destroy)
+
+        return task
+
+    def discard(self, task):
+        # the caller must hold the condition lock.
         task.active = False
-        self.delete(task, destroy)
+        self.delete(task, True)
+
+    def compact(self):
+        # the caller must hold the condition lock.
+        queue = []
+
+        for entry in self.queue:
+            task = entry[3]
+
+            if task.sequence != entry[2]:
+                continue
+
+            if task.group and not task.group.active:
+                self.dequeue(task)
+                self.discard(task)
+                continue
+
+            queue.append(entry)
+
+        heapq.heapify(queue)
+        self.queue = queue
+        self.stale = 0
+
+    def create_group(self):
+        return TaskGroup(self)
 
     def prepend(self, function, delay, *args, **kwargs):
-        task = Task(self.next_id)
+        priority = kwargs.pop('priority', 0)
+        group = kwargs.pop('group', None)
+
+        with self.condition:
+            if group and not group.active:
+                raise TaskManagerError('Failed to add task, group has been cancelled!')
+
+            task = self.allocate()
+
+            if group:
+                group.count += 1
+
         task.function = function
         task.delay = delay
+        task.priority = priority
+        task.group = group
         task.args = args
         task.kwargs = kwargs
 
-        return self.activate(task)
+        return TaskHandle(self.activate(task))
 
     def add(self, function, *args, **kwargs):
         return self.prepend(function, 0, *args, **kwargs)
@@ -132,30 +655,215 @@ class TaskManager(object):
         self.deactivate(task, destroy=True)
 
     def cycle(self, task):
-        self.deactivate(task)
-        self.activate(task)
+        task = self.deactivate(task)
 
-    def mainloop(self):
-        while True:
-            for name in list(self.waiting):
-                self.running[name] = self.waiting.pop(name)
+        if task:
+            self.activate(task)
+
+    def post(self, function, *args, **kwargs):
+        """
+        Hands a function over to the main thread, tasks must post anything
+        that touches Tk instead of calling it from the task thread
+        """
+
+        self.posted.append((function, args, kwargs))
+
+    def enable_profiler(self, threshold=0.005, slow_handler=None):
+        """
+        Starts recording per task execution times, the report is dumped
+        when the task manager is destroyed
+        """
+
+        self.profiler = TaskProfiler(threshold, slow_handler)
+        return self.profiler
+
+    def disable_profiler(self):
+        if self.profiler:
+            self.profiler.destroy()
+
+        self.profiler = None
+
+    def submit(self, function, *args, **kwargs):
+        return self.executor.submit(function, *args, **kwargs)
+
+    def drain(self):
+        # deque appends and pops are atomic, so the main thread can drain
+        # while tasks keep posting without taking the condition lock.
+        for index in xrange(len(self.posted)):
+            function, args, kwargs = self.posted.popleft()
+            function(*args, **kwargs)
+
+    def add_idle(self, function, *args, **kwargs):
+        """
+        Queues non urgent work which only runs on the main thread once a
+        frame has finished under its time budget
+        """
+
+        self.idle.append((function, args, kwargs))
+
+    def run_idle(self, timestamp):
+        deadline = TaskIdleDeadline(timestamp)
+
+        # callbacks continued in this period are only run again in the next one.
+        for index in xrange(len(self.idle)):
+            if deadline.time_remaining <= 0:
+                break
+
+            function, args, kwargs = self.idle.popleft()
 
-            for task in list(self.running.values()):
+            if function(deadline, *args, **kwargs) == TaskResult.CONT:
+                self.idle.append((function, args, kwargs))
+
+    def reschedule(self, task, result, now):
+        # the caller must hold the condition lock.
+        if result == TaskResult.CONT:
+            self.schedule(task, now + self.TIMEOUT)
+        elif result == TaskResult.WAIT:
+            deadline = task.deadline + task.delay
+
+            # never try to catch up on missed runs, just fall back in step.
+            if deadline <= now:
+                deadline = now + task.delay
+
+            self.schedule(task, deadline)
+        else:
+            task.active = False
+            self.delete(task, True)
+
+    def poll(self):
+        """
+        Runs every task which is due and returns the number of seconds until
+        the next task is due
+        """
+
+        now = self.clock.time()
+        due = []
+
+        with self.condition:
+            if self.stale > self.COMPACT_SIZE and self.stale * 2 > len(self.queue):
+                self.compact()
+
+            while self.queue and self.queue[0][0] <= now:
+                entry = heapq.heappop(self.queue)
+                task = entry[3]
+
+                if task.sequence != entry[2]:
+                    self.stale -= 1
+                    continue
+
+                if task.group and not task.group.active:
+                    self.stale -= 1
+                    self.dequeue(task)
+                    self.discard(task)
+                    continue
+
+                self.dequeue(task)
+                due.append(entry)
+
+        # heap order is deadline then priority, a stable sort on priority alone
+        # runs the higher priority tasks first and keeps deadline order otherwise.
+        due.sort(key=operator.itemgetter(1))
+        due = collections.deque(due)
+        results = []
+        running = None
+
+        # the profiler may be disabled from another thread halfway through.
+        profiler = self.profiler
+
+        try:
+            while due:
+                deadline, priority, sequence, task = due.popleft()
+
+                # the task may have been removed by a task which ran before it.
+                if task.sequence != sequence:
+                    continue
+
+                # or its group cancelled, it is discarded along with the results.
+                if task.group and not task.group.active:
+                    results.append((task, sequence, TaskResult.DONE))
+                    continue
+
+                self.latency.record(now - deadline)
+                running = (task, sequence)
+
+                if not profiler:
+                    result = task.run()
+                    running = None
+                    results.append((task, sequence, result))
+                    continue
+
+                # the label must be taken before running, the task may be recycled.
+                label = profiler.label(task)
+                started = time.time()
                 result = task.run()
+                running = None
+                results.append((task, sequence, result))
+                profiler.record(label, time.time() - started, now - deadline)
+        finally:
+            self.settle(results, running, due, now)
+
+        return self.timeout
+
+    def settle(self, results, running, due, now):
+        with self.condition:
+            # a task which raised is dropped, the tasks due after it were
+            # never run and stay due for the next pass.
+            if running:
+                results.append(running + (TaskResult.DONE,))
+
+            for deadline, priority, sequence, task in due:
+                if task.sequence != sequence:
+                    continue
+
+                if task.group and not task.group.active:
+                    self.discard(task)
+                else:
+                    self.schedule(task, deadline)
+
+            for task, sequence, result in results:
+                # the task removed or rescheduled itself while it was running.
+                if task.sequence != sequence:
+                    continue
 
-                if task.can_delay:
-                    task.can_delay = False
+                if task.group and not task.group.active:
+                    self.discard(task)
+                    continue
 
-                if result == TaskResult.DONE:
-                    self.remove(task)
-                elif result == TaskResult.CONT:
-                    self.cycle(task)
-                elif result == TaskResult.WAIT:
-                    task.can_delay = True
+                self.reschedule(task, result, now)
+
+    def mainloop(self):
+        while True:
+            self.poll()
+
+            with self.condition:
+                timeout = self.timeout
+
+                # the wait is in real seconds, a stopped clock is checked
+                # again until it starts moving.
+                if timeout is not None and self.clock.stopped:
+                    timeout = self.PAUSED_TIMEOUT
                 else:
-                    self.remove(task)
+                    timeout = self.clock.real(timeout)
+
+                if timeout is None or timeout > 0:
+                    self.condition.wait(timeout)
+
+    def attach(self, root):
+        """
+        Drives the tasks from the Tk event loop instead of a thread, a single
+        after callback is kept registered at the earliest deadline
+        """
 
-            time.sleep(self.TIMEOUT)
+        with self.condition:
+            self.root = root
+            self.wake()
+
+    def detach(self):
+        with self.condition:
+            if self.after_id:
+                self.root.after_cancel(self.after_id)
+
+            self.root = self.after_id = self.after_deadline = None
 
     def run(self, threaded=True, daemon=True):
         try:
@@ -169,10 +877,28 @@ class TaskManager(object):
             self.destroy()
 
     def destroy(self):
-        for name in list(self.waiting):
-            self.waiting.pop(name).destroy()
+        self.clock.unwatch(self.retime)
 
-        for name in list(self.running):
-            self.running.pop(name).destroy()
+        if self.root:
+            self.detach()
 
-        self.id = 0
+        with self.condition:
+            for name in list(self.tasks):
+                task = self.tasks.pop(name)
+                task.active = False
+                self.recycle(task)
+
+            # ids keep counting up, a handle held across the destroy must
+            # never match a task recycled afterwards.
+            self.queue = []
+            self.stale = 0
+
+        self.posted.clear()
+        self.idle.clear()
+        self.latency.reset()
+        self.executor.destroy()
+
+        if self.profiler:
+            self.profiler.dump()
+
+        self.disable_profiler()
@@ -0,0 +1,147 @@
+import Tkinter
+from PIL import ImageTk
+from interstellar import backend
+
+class BatchedCanvas(Tkinter.Canvas):
+    """
+    A Tk canvas which holds back coordinate, image and state changes until
+    the end of the frame, they are then sent to Tcl in a single call
+    """
+
+    # the changes are passed as lists rather than a script so Tcl never has
+    # to parse anything, the proc itself is compiled once.
+    BATCH = 'interstellar_batch'
+    BATCH_SCRIPT = '''proc %s {canvas moves configs} {
+    foreach {item coords} $moves { $canvas coords $item $coords }
+    foreach {item options} $configs { $canvas itemconfigure $item {*}$options }
+}''' % BATCH
+
+    def __init__(self, master=None, **options):
+        Tkinter.Canvas.__init__(self, master, **options)
+
+        if not self.tk.call('info', 'procs', self.BATCH):
+            self.tk.eval(self.BATCH_SCRIPT)
+
+        # an item moved twice in a frame is only moved once, the changes of
+        # one item never depend on another so they are kept per item.
+        self.moves = {}
+        self.configs = {}
+
+    def coords(self, item, *coords):
+        if not coords:
+            self.flush()
+            return Tkinter.Canvas.coords(self, item)
+
+        # coordinates may be passed flat or as a single sequence like Tk.
+        if len(coords) == 1:
+            coords = coords[0]
+
+        self.moves[item] = coords
+
+    def itemconfigure(self, item, cnf=None, **options):
+        # reading an option back has to see every change made before it.
+        if cnf or not options:
+            self.flush()
+            return Tkinter.Canvas.itemconfigure(self, item, cnf, **options)
+
+        if item in self.configs:
+            self.configs[item].update(options)
+        else:
+            self.configs[item] = options
+
+    itemconfig = itemconfigure
+
+    def itemcget(self, item, option):
+        self.flush()
+        return Tkinter.Canvas.itemcget(self, item, option)
+
+    def create_image(self, *args, **options):
+        # items are stacked in the order they are made, anything queued for
+        # the items below has to land first.
+        self.flush()
+        return Tkinter.Canvas.create_image(self, *args, **options)
+
+    def find_withtag(self, tag):
+        self.flush()
+        return Tkinter.Canvas.find_withtag(self, tag)
+
+    def delete(self, *tags):
+        # nothing queued survives clearing the whole canvas.
+        if 'all' in tags:
+            self.moves.clear()
+            self.configs.clear()
+        else:
+            self.flush()
+
+        Tkinter.Canvas.delete(self, *tags)
+
+    def flush(self):
+        if not self.moves and not self.configs:
+            return
+
+        moves, configs = [], []
+
+        for item, coords in self.moves.iteritems():
+            moves += (item, tuple(coords))
+
+        for item, options in self.configs.iteritems():
+            configs += (item, tuple(value for key, option in options.iteritems() for value in \
+                ('-' + key, option)))
+
+        self.moves.clear()
+        self.configs.clear()
+        self.tk.call(self.BATCH, self._w, tuple(moves), tuple(configs))
+
+    def destroy(self):
+        self.moves.clear()
+        self.configs.clear()
+        Tkinter.Canvas.destroy(self)
+
+class CompositorCanvas(backend.ItemCanvas, Tkinter.Canvas):
+    """
+    A Tk canvas which shows one photo image, its items are composited into
+    that photo image once per frame instead of being drawn by Tk
+    """
+
+    def __init__(self, master=None, **options):
+        Tkinter.Canvas.__init__(self, master, **options)
+
+        self.create_items()
+        self.dirty = True
+        self.compositor = backend.Compositor(int(options.get('width', 0)), int(options.get('height', 0)),
+            options.get('background', 'black'))
+
+        self.frame = ImageTk.PhotoImage(self.compositor.buffer)
+        Tkinter.Canvas.create_image(self, 0, 0, image=self.frame, anchor=Tkinter.NW)
+
+    def create_image(self, x, y, **options):
+        self.dirty = True
+        return backend.ItemCanvas.create_image(self, x, y, **options)
+
+    def coords(self, item, *coords):
+        if coords:
+            self.dirty = True
+
+        return backend.ItemCanvas.coords(self, item, *coords)
+
+    def itemconfigure(self, item, **options):
+        self.dirty = True
+        backend.ItemCanvas.itemconfigure(self, item, **options)
+
+    itemconfig = itemconfigure
+
+    def delete(self, *tags):
+        self.dirty = True
+        backend.ItemCanvas.delete(self, *tags)
+
+    def render(self):
+        # a menu which does not move pushes nothing to Tk at all.
+        if not self.dirty:
+            return
+
+        self.frame.paste(self.compositor.composite(self.items))
+        self.dirty = False
+
+    def destroy(self):
+        self.items = {}
+        Tkinter.Canvas.destroy(self)
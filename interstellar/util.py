@@ -1,6 +1,13 @@
 import os
 import random
-from ctypes import windll, byref, create_unicode_buffer, create_string_buffer
+from ctypes import byref, create_unicode_buffer, create_string_buffer
+
+try:
+    from ctypes import windll
+except ImportError:
+    # private fonts can only be loaded on windows, labels fall back to the
+    # default font everywhere else.
+    windll = None
 
 FR_PRIVATE = 0x10
 FR_NOT_ENUM = 0x20
@@ -19,6 +26,9 @@ def load_font(filepath, private=True, enumerable=False):
     if not os.path.exists(filepath):
         raise IOError('Failed to find font file %s!' % filepath)
 
+    if not windll:
+        return False
+
     # This function was taken from
     # https://github.com/ifwe/digsby/blob/f5fe00244744aa131e07f09348d10563f3d8fa99/digsby/src/gui/native/win/winfonts.py#L15
     # This function is written for Python 2.x. For 3.x, you